@@ -1,11 +1,19 @@
 """TreeQuest MCP Server implementation."""
 
 import ast
-import asyncio
 import anyio
+import anyio.to_thread
+import asyncio
 import click
+import hashlib
 import json
-import uuid
+import math
+import os
+import random
+import sys
+from collections import OrderedDict
+from functools import lru_cache, partial
+from types import CodeType
 from typing import Dict, Any, Optional, List, Tuple
 import mcp.types as types
 from mcp.server.lowlevel import Server
@@ -13,52 +21,176 @@ from mcp.server.lowlevel import Server
 import treequest as tq
 from treequest.types import StateScoreType, GenerateFnType
 
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore[assignment]
+
+try:
+    import orjson
+
+    def _dump(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+
+    def _dump(obj: Any) -> str:
+        return json.dumps(obj, indent=2)
+
+
+# Shared globals template for executing generate function code; copied per
+# exec so each snippet still gets its own namespace. Hoisting it avoids
+# re-resolving __import__("random")/__import__("math") per action per step.
+_EXEC_GLOBALS_TEMPLATE = {
+    "Optional": Optional,
+    "Tuple": Tuple,
+    "List": List,
+    "random": random,
+    "math": math,
+}
 
 DANGEROUS_MODULES = frozenset({'os', 'sys', 'subprocess', 'shutil', 'socket', 'ctypes', 'multiprocessing'})
 DANGEROUS_BUILTINS = frozenset({'eval', 'exec', 'compile', 'open', '__import__', 'globals', 'locals', 'vars', 'getattr', 'setattr', 'delattr'})
 
 
-def _check_code_safety(code: str, action_name: str) -> Optional[str]:
-    """Check code safety using AST analysis."""
+class _SafetyVisitor(ast.NodeVisitor):
+    """Single-pass safety scan that records the first violation and stops descending."""
+
+    __slots__ = ('error', 'action_name')
+
+    def __init__(self, action_name: str):
+        self.error: Optional[str] = None
+        self.action_name = action_name
+
+    def generic_visit(self, node: ast.AST) -> None:
+        if self.error is None:
+            super().generic_visit(node)
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            module_name = alias.name.partition('.')[0]
+            if module_name in DANGEROUS_MODULES:
+                self.error = f"Generate function for action '{self.action_name}' imports dangerous module: {module_name}"
+                return
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        if node.module:
+            module_name = node.module.partition('.')[0]
+            if module_name in DANGEROUS_MODULES:
+                self.error = f"Generate function for action '{self.action_name}' imports from dangerous module: {module_name}"
+
+    def visit_Call(self, node: ast.Call) -> None:
+        func = node.func
+        if isinstance(func, ast.Name):
+            if func.id in DANGEROUS_BUILTINS:
+                self.error = f"Generate function for action '{self.action_name}' uses dangerous builtin: {func.id}"
+                return
+        elif isinstance(func, ast.Attribute):
+            if func.attr in DANGEROUS_BUILTINS:
+                self.error = f"Generate function for action '{self.action_name}' uses dangerous function: {func.attr}"
+                return
+        self.generic_visit(node)
+
+
+def _check_code_safety(code: str, action_name: str) -> Tuple[Optional[str], Optional[ast.Module]]:
+    """Check code safety using AST analysis, returning the parsed tree for reuse."""
     try:
         tree = ast.parse(code)
     except SyntaxError as e:
-        return f"Syntax error in code for action '{action_name}': {e}"
-    
-    for node in ast.walk(tree):
-        if isinstance(node, ast.Import):
-            for alias in node.names:
-                module_name = alias.name.split('.')[0]
-                if module_name in DANGEROUS_MODULES:
-                    return f"Generate function for action '{action_name}' imports dangerous module: {module_name}"
-        
-        elif isinstance(node, ast.ImportFrom):
-            if node.module:
-                module_name = node.module.split('.')[0]
-                if module_name in DANGEROUS_MODULES:
-                    return f"Generate function for action '{action_name}' imports from dangerous module: {module_name}"
-        
-        elif isinstance(node, ast.Call):
-            if isinstance(node.func, ast.Name):
-                if node.func.id in DANGEROUS_BUILTINS:
-                    return f"Generate function for action '{action_name}' uses dangerous builtin: {node.func.id}"
-            elif isinstance(node.func, ast.Attribute):
-                if node.func.attr in DANGEROUS_BUILTINS:
-                    return f"Generate function for action '{action_name}' uses dangerous function: {node.func.attr}"
-    
-    return None
+        return f"Syntax error in code for action '{action_name}': {e}", None
+
+    visitor = _SafetyVisitor(action_name)
+    visitor.visit(tree)
+    return visitor.error, tree
+
+
+# Content-addressed record of snippets that already passed the safety scan.
+# Safety of a fixed string never changes, so a digest hit skips the AST walk
+# even when the snippet arrives under a different action name (which would
+# miss the lru_cache below). Positive-only, so each entry is a 16-byte digest.
+_VALIDATED_DIGESTS: set = set()
+_VALIDATED_DIGESTS_MAX = 4096
+
+
+@lru_cache(maxsize=256)
+def _compile_generate_fn(code: str, action_name: str) -> Tuple[Optional[str], Optional[CodeType]]:
+    """Safety-check and compile generate function code, memoized on the source string.
+
+    Long-running searches typically resubmit the same snippets on every step;
+    caching the (safety_error, code_object) pair means `ast.parse` plus the
+    safety walk and `compile` run once per unique snippet instead of once per step.
+    """
+    digest = hashlib.blake2b(code.encode(), digest_size=16).digest()
+    if digest in _VALIDATED_DIGESTS:
+        return None, compile(code, "<gen_fn>", "exec")
+
+    safety_error, tree = _check_code_safety(code, action_name)
+    if safety_error:
+        return safety_error, None
+
+    if len(_VALIDATED_DIGESTS) < _VALIDATED_DIGESTS_MAX:
+        _VALIDATED_DIGESTS.add(digest)
+    # Compile the already-parsed tree so the source is parsed exactly once.
+    return None, compile(tree, "<gen_fn>", "exec")
+
+
+def _top_k_pairs(state, algorithm, k: int):
+    """Top-k state-score pairs by score.
+
+    Only scores participate in the comparison, so an O(N) np.argpartition
+    over a float array replaces the O(N log N) Python tuple sort inside
+    tq.top_k. Falls back to tq.top_k when NumPy is unavailable or the tree
+    has fewer than k scored nodes (preserving its error message).
+    """
+    if np is None:
+        return tq.top_k(state, algorithm, k=k)
+
+    pairs = algorithm.get_state_score_pairs(state)
+    if len(pairs) < k:
+        return tq.top_k(state, algorithm, k=k)
+
+    scores = np.fromiter(
+        (score for _, score in pairs), dtype=np.float64, count=len(pairs)
+    )
+    idx = np.argpartition(scores, -k)[-k:]
+    idx = idx[np.argsort(-scores[idx], kind="stable")]
+    return [pairs[i] for i in idx]
+
+
+DEFAULT_MAX_STATE_CHARS = 4096
+
+
+def _truncate(s: str, n: int = DEFAULT_MAX_STATE_CHARS) -> str:
+    """Cap a state string at n characters, marking how much was dropped."""
+    return s if len(s) <= n else s[:n] + f"...[{len(s) - n} chars truncated]"
+
+
+def _serialize_state(state: Any, max_chars: int) -> str:
+    """Stringify, truncate, and intern a node state for a JSON payload.
+
+    MCTS branches frequently explore near-identical continuations, so many
+    state strings repeat; interning makes the duplicates share one string
+    object instead of each pair holding its own copy.
+    """
+    s = state if isinstance(state, str) else str(state)
+    return sys.intern(_truncate(s, max_chars))
 
 
 class TreeQuestSession:
     """Manages a single tree search session."""
     
     def __init__(self, algorithm_name: str, algorithm_params: Dict[str, Any]):
-        self.session_id = str(uuid.uuid4())
+        # Cryptographically random 32-char hex id; skips the uuid.UUID
+        # object construction and hyphen formatting of str(uuid.uuid4()).
+        self.session_id = os.urandom(16).hex()
         self.algorithm_name = algorithm_name
         self.algorithm_params = algorithm_params
         self.algorithm = self._create_algorithm()
         self.state = self.algorithm.init_tree()
         self.step_count = 0
+        self.node_count = len(self.state.tree)
+        # Serializes concurrent steps on this session; steps on different
+        # sessions can still run in parallel worker threads.
+        self.step_lock = asyncio.Lock()
     
     def _create_algorithm(self):
         """Create the algorithm instance based on name and parameters."""
@@ -82,14 +214,239 @@ class TreeQuestSession:
         """Perform a step with proper type handling."""
         self.state = self.algorithm.step(self.state, generate_fns)  # type: ignore
         self.step_count += 1
+        self.node_count = len(self.state.tree)
     
     def get_state_score_pairs(self):
         """Get state score pairs with proper type handling."""
         return self.algorithm.get_state_score_pairs(self.state)  # type: ignore
 
 
-sessions: Dict[str, TreeQuestSession] = {}
-sessions_lock = asyncio.Lock()
+# The tool schemas are static; build them once at import instead of
+# reconstructing the nested dicts on every list_tools call.
+_TOOLS: list[types.Tool] = [
+    types.Tool(
+        name="init_tree",
+        title="Initialize Tree Search",
+        description="Initialize a new tree search session with specified algorithm",
+        inputSchema={
+            "type": "object",
+            "required": ["algorithm"],
+            "properties": {
+                "algorithm": {
+                    "type": "string",
+                    "enum": ["StandardMCTS", "ABMCTSA", "ABMCTSM"],
+                    "description": "Tree search algorithm to use"
+                },
+                "params": {
+                    "type": "object",
+                    "description": "Algorithm-specific parameters",
+                    "properties": {
+                        "exploration_weight": {
+                            "type": "number",
+                            "minimum": 0,
+                            "maximum": 10,
+                            "description": "Exploration weight for UCT (default: 1.0)"
+                        },
+                        "samples_per_action": {
+                            "type": "integer",
+                            "minimum": 1,
+                            "maximum": 100,
+                            "description": "Number of samples per action (default: 1)"
+                        }
+                    }
+                }
+            }
+        }
+    ),
+    types.Tool(
+        name="step_tree",
+        title="Step Tree Search",
+        description="Perform one step of tree search using provided generate functions",
+        inputSchema={
+            "type": "object",
+            "required": ["session_id", "generate_functions"],
+            "properties": {
+                "session_id": {
+                    "type": "string",
+                    "description": "Session ID from init_tree"
+                },
+                "generate_functions": {
+                    "type": "object",
+                    "description": "Map of action names to generate function code",
+                    "minProperties": 1,
+                    "additionalProperties": {
+                        "type": "string",
+                        "minLength": 1,
+                        "maxLength": 10000,
+                        "description": "Python code for generate function"
+                    }
+                }
+            }
+        }
+    ),
+    types.Tool(
+        name="get_tree_state",
+        title="Get Tree State",
+        description="Extract current tree state and statistics",
+        inputSchema={
+            "type": "object",
+            "required": ["session_id"],
+            "properties": {
+                "session_id": {
+                    "type": "string",
+                    "description": "Session ID"
+                },
+                "max_state_chars": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "description": "Maximum characters of each state string to return (default: 4096)",
+                    "default": 4096
+                }
+            }
+        }
+    ),
+    types.Tool(
+        name="rank_nodes",
+        title="Rank Tree Nodes",
+        description="Get top-k nodes using TreeQuest's ranking functionality",
+        inputSchema={
+            "type": "object",
+            "required": ["session_id"],
+            "properties": {
+                "session_id": {
+                    "type": "string",
+                    "description": "Session ID"
+                },
+                "k": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "maximum": 1000,
+                    "description": "Number of top nodes to return (default: 10)",
+                    "default": 10
+                },
+                "max_state_chars": {
+                    "type": "integer",
+                    "minimum": 1,
+                    "description": "Maximum characters of each state string to return (default: 4096)",
+                    "default": 4096
+                }
+            }
+        }
+    ),
+    types.Tool(
+        name="list_sessions",
+        title="List Sessions",
+        description="List all active tree search sessions",
+        inputSchema={
+            "type": "object",
+            "properties": {}
+        }
+    ),
+    types.Tool(
+        name="delete_session",
+        title="Delete Session",
+        description="Clean up a tree search session",
+        inputSchema={
+            "type": "object",
+            "required": ["session_id"],
+            "properties": {
+                "session_id": {
+                    "type": "string",
+                    "description": "Session ID to delete"
+                }
+            }
+        }
+    ),
+    types.Tool(
+        name="get_tree_visualization",
+        title="Get Tree Visualization",
+        description="Generate tree visualization using Graphviz",
+        inputSchema={
+            "type": "object",
+            "required": ["session_id"],
+            "properties": {
+                "session_id": {
+                    "type": "string",
+                    "description": "Session ID"
+                },
+                "format": {
+                    "type": "string",
+                    "enum": ["png", "pdf", "svg", "dot"],
+                    "description": "Output format (default: png)",
+                    "default": "png"
+                },
+                "show_scores": {
+                    "type": "boolean",
+                    "description": "Whether to show scores in node labels (default: true)",
+                    "default": True
+                },
+                "max_label_length": {
+                    "type": "integer",
+                    "description": "Maximum length for node labels (default: 20)",
+                    "default": 20
+                },
+                "title": {
+                    "type": "string",
+                    "description": "Optional title for the visualization"
+                }
+            }
+        }
+    )
+]
+
+# Precompiled Draft-7 validators, one per tool, built once at import. The
+# bounds (minimum/maximum/maxLength) live in the inputSchema itself, so the
+# schema advertised to clients and the checks actually enforced cannot drift.
+try:
+    import jsonschema
+
+    # mcp 1.x exposes the schema as Tool.inputSchema, 2.x as Tool.input_schema.
+    _TOOL_VALIDATORS = {
+        tool.name: jsonschema.Draft7Validator(
+            getattr(tool, "inputSchema", None) or tool.input_schema
+        )
+        for tool in _TOOLS
+    }
+except ImportError:
+    _TOOL_VALIDATORS = {}
+
+
+def _validate_tool_arguments(tool_name: str, arguments: dict) -> Optional[str]:
+    """Validate arguments against the tool's precompiled schema validator."""
+    validator = _TOOL_VALIDATORS.get(tool_name)
+    if validator is None:
+        return None
+    error = jsonschema.exceptions.best_match(validator.iter_errors(arguments))
+    if error is not None:
+        return error.message
+    return None
+
+
+# Cap on concurrently tracked sessions; overridable via --max-sessions.
+DEFAULT_MAX_SESSIONS = 100
+
+MAX_SESSIONS = DEFAULT_MAX_SESSIONS
+
+# Single dict operations (get/set/del/iteration snapshot) are atomic under
+# CPython, so no lock is needed around session bookkeeping. The OrderedDict
+# keeps least-recently-used order so old sessions can be evicted when the
+# cap is hit; each session holds a growing tree, so the cap bounds memory.
+sessions: "OrderedDict[str, TreeQuestSession]" = OrderedDict()
+
+
+def _touch_session(session_id: str) -> None:
+    """Mark a session as most recently used for LRU eviction."""
+    try:
+        sessions.move_to_end(session_id)
+    except KeyError:
+        pass
+
+
+def _store_session(session: TreeQuestSession) -> None:
+    """Insert a session, evicting the least recently used ones beyond the cap."""
+    while len(sessions) >= MAX_SESSIONS:
+        sessions.popitem(last=False)
+    sessions[session.session_id] = session
 
 
 def _validate_session_exists(session_id: str) -> Optional[str]:
@@ -107,7 +464,14 @@ def _validate_session_exists(session_id: str) -> Optional[str]:
 
 
 def _validate_algorithm_params(algorithm_name: str, params: Dict[str, Any]) -> Optional[str]:
-    """Validate algorithm parameters are within acceptable ranges."""
+    """Validate algorithm parameters are within acceptable ranges.
+
+    Fallback path for when jsonschema is not installed; otherwise the
+    precompiled schema validators enforce the same bounds in call_tool.
+    """
+    if _TOOL_VALIDATORS:
+        return None
+
     if "exploration_weight" in params:
         weight = params["exploration_weight"]
         if not isinstance(weight, (int, float)):
@@ -130,33 +494,44 @@ def _validate_algorithm_params(algorithm_name: str, params: Dict[str, Any]) -> O
 
 
 def _validate_generate_functions(generate_functions: Dict[str, str]) -> Optional[str]:
-    """Validate generate function inputs."""
-    if not generate_functions:
-        return "At least one generate function must be provided"
-    
-    if not isinstance(generate_functions, dict):
-        return f"generate_functions must be a dictionary, got {type(generate_functions).__name__}"
-    
+    """Validate generate function inputs.
+
+    Type and length constraints are covered by the precompiled schema
+    validators when jsonschema is installed; the manual checks here are the
+    fallback. The whitespace and code-safety checks always run, since JSON
+    Schema cannot express them.
+    """
+    if not _TOOL_VALIDATORS:
+        if not generate_functions:
+            return "At least one generate function must be provided"
+
+        if not isinstance(generate_functions, dict):
+            return f"generate_functions must be a dictionary, got {type(generate_functions).__name__}"
+
     for action_name, code in generate_functions.items():
-        if not isinstance(action_name, str):
-            return f"Action name must be a string, got {type(action_name).__name__}"
-        
-        if not action_name.strip():
+        if not _TOOL_VALIDATORS:
+            # Exact type checks skip the MRO walk; str subclasses are not
+            # expected from JSON-decoded arguments.
+            if type(action_name) is not str:
+                return f"Action name must be a string, got {type(action_name).__name__}"
+
+            if type(code) is not str:
+                return f"Generate function code for action '{action_name}' must be a string, got {type(code).__name__}"
+
+            if len(code) > 10000:
+                return f"Generate function code for action '{action_name}' is too long ({len(code)} chars). Maximum allowed is 10000 characters."
+
+        # isspace() probes emptiness without the full string copy .strip() makes.
+        if not action_name or action_name.isspace():
             return "Action names cannot be empty or whitespace"
-        
-        if not isinstance(code, str):
-            return f"Generate function code for action '{action_name}' must be a string, got {type(code).__name__}"
-        
-        if not code.strip():
+
+        if not code or code.isspace():
             return f"Generate function code for action '{action_name}' cannot be empty"
-        
-        if len(code) > 10000:
-            return f"Generate function code for action '{action_name}' is too long ({len(code)} chars). Maximum allowed is 10000 characters."
-        
-        safety_error = _check_code_safety(code, action_name)
+
+        safety_error, _ = _compile_generate_fn(code, action_name)
         if safety_error:
             return safety_error
-    
+
     return None
 
 
@@ -168,182 +543,37 @@ def _validate_generate_functions(generate_functions: Dict[str, str]) -> Optional
     default="stdio",
     help="Transport type",
 )
-def main(port: int, transport: str) -> int:
+@click.option(
+    "--max-sessions",
+    default=DEFAULT_MAX_SESSIONS,
+    help="Maximum number of concurrent sessions before LRU eviction",
+)
+def main(port: int, transport: str, max_sessions: int) -> int:
     """Main entry point for the TreeQuest MCP server."""
+    global MAX_SESSIONS
+    MAX_SESSIONS = max_sessions
+
     app = Server("treequest-mcp-server")
 
     @app.call_tool()
     async def call_tool(name: str, arguments: dict) -> list[types.ContentBlock]:
         """Handle tool calls."""
-        if name == "init_tree":
-            return await init_tree_tool(arguments)
-        elif name == "step_tree":
-            return await step_tree_tool(arguments)
-        elif name == "get_tree_state":
-            return await get_tree_state_tool(arguments)
-        elif name == "rank_nodes":
-            return await rank_nodes_tool(arguments)
-        elif name == "list_sessions":
-            return await list_sessions_tool(arguments)
-        elif name == "delete_session":
-            return await delete_session_tool(arguments)
-        elif name == "get_tree_visualization":
-            return await get_tree_visualization_tool(arguments)
-        else:
+        schema_error = _validate_tool_arguments(name, arguments)
+        if schema_error:
+            return [types.TextContent(
+                type="text",
+                text=f"Parameter validation error: {schema_error}"
+            )]
+
+        handler = tool_handlers.get(name)
+        if handler is None:
             raise ValueError(f"Unknown tool: {name}")
+        return await handler(arguments)
 
     @app.list_tools()
     async def list_tools() -> list[types.Tool]:
         """List available tools."""
-        return [
-            types.Tool(
-                name="init_tree",
-                title="Initialize Tree Search",
-                description="Initialize a new tree search session with specified algorithm",
-                inputSchema={
-                    "type": "object",
-                    "required": ["algorithm"],
-                    "properties": {
-                        "algorithm": {
-                            "type": "string",
-                            "enum": ["StandardMCTS", "ABMCTSA", "ABMCTSM"],
-                            "description": "Tree search algorithm to use"
-                        },
-                        "params": {
-                            "type": "object",
-                            "description": "Algorithm-specific parameters",
-                            "properties": {
-                                "exploration_weight": {
-                                    "type": "number",
-                                    "description": "Exploration weight for UCT (default: 1.0)"
-                                },
-                                "samples_per_action": {
-                                    "type": "integer",
-                                    "description": "Number of samples per action (default: 1)"
-                                }
-                            }
-                        }
-                    }
-                }
-            ),
-            types.Tool(
-                name="step_tree",
-                title="Step Tree Search",
-                description="Perform one step of tree search using provided generate functions",
-                inputSchema={
-                    "type": "object",
-                    "required": ["session_id", "generate_functions"],
-                    "properties": {
-                        "session_id": {
-                            "type": "string",
-                            "description": "Session ID from init_tree"
-                        },
-                        "generate_functions": {
-                            "type": "object",
-                            "description": "Map of action names to generate function code",
-                            "additionalProperties": {
-                                "type": "string",
-                                "description": "Python code for generate function"
-                            }
-                        }
-                    }
-                }
-            ),
-            types.Tool(
-                name="get_tree_state",
-                title="Get Tree State",
-                description="Extract current tree state and statistics",
-                inputSchema={
-                    "type": "object",
-                    "required": ["session_id"],
-                    "properties": {
-                        "session_id": {
-                            "type": "string",
-                            "description": "Session ID"
-                        }
-                    }
-                }
-            ),
-            types.Tool(
-                name="rank_nodes",
-                title="Rank Tree Nodes",
-                description="Get top-k nodes using TreeQuest's ranking functionality",
-                inputSchema={
-                    "type": "object",
-                    "required": ["session_id"],
-                    "properties": {
-                        "session_id": {
-                            "type": "string",
-                            "description": "Session ID"
-                        },
-                        "k": {
-                            "type": "integer",
-                            "description": "Number of top nodes to return (default: 10)",
-                            "default": 10
-                        }
-                    }
-                }
-            ),
-            types.Tool(
-                name="list_sessions",
-                title="List Sessions",
-                description="List all active tree search sessions",
-                inputSchema={
-                    "type": "object",
-                    "properties": {}
-                }
-            ),
-            types.Tool(
-                name="delete_session",
-                title="Delete Session",
-                description="Clean up a tree search session",
-                inputSchema={
-                    "type": "object",
-                    "required": ["session_id"],
-                    "properties": {
-                        "session_id": {
-                            "type": "string",
-                            "description": "Session ID to delete"
-                        }
-                    }
-                }
-            ),
-            types.Tool(
-                name="get_tree_visualization",
-                title="Get Tree Visualization",
-                description="Generate tree visualization using Graphviz",
-                inputSchema={
-                    "type": "object",
-                    "required": ["session_id"],
-                    "properties": {
-                        "session_id": {
-                            "type": "string",
-                            "description": "Session ID"
-                        },
-                        "format": {
-                            "type": "string",
-                            "enum": ["png", "pdf", "svg", "dot"],
-                            "description": "Output format (default: png)",
-                            "default": "png"
-                        },
-                        "show_scores": {
-                            "type": "boolean",
-                            "description": "Whether to show scores in node labels (default: true)",
-                            "default": True
-                        },
-                        "max_label_length": {
-                            "type": "integer",
-                            "description": "Maximum length for node labels (default: 20)",
-                            "default": 20
-                        },
-                        "title": {
-                            "type": "string",
-                            "description": "Optional title for the visualization"
-                        }
-                    }
-                }
-            )
-        ]
+        return _TOOLS
 
     async def init_tree_tool(arguments: dict) -> list[types.ContentBlock]:
         """Initialize a new tree search session."""
@@ -359,9 +589,8 @@ def main(port: int, transport: str) -> int:
         
         try:
             session = TreeQuestSession(algorithm_name, params)
-            async with sessions_lock:
-                sessions[session.session_id] = session
-            
+            _store_session(session)
+
             result = {
                 "session_id": session.session_id,
                 "algorithm": algorithm_name,
@@ -371,7 +600,7 @@ def main(port: int, transport: str) -> int:
             
             return [types.TextContent(
                 type="text",
-                text=json.dumps(result, indent=2)
+                text=_dump(result)
             )]
         except ValueError as e:
             return [types.TextContent(
@@ -404,19 +633,15 @@ def main(port: int, transport: str) -> int:
             )]
         
         session = sessions[session_id]
+        _touch_session(session_id)
         
         try:
             generate_fns = {}
             for action_name, code in generate_functions_code.items():
                 try:
-                    exec_globals = {
-                        "Optional": Optional,
-                        "Tuple": Tuple,
-                        "random": __import__("random"),
-                        "math": __import__("math"),
-                        "List": List,
-                    }
-                    exec(code, exec_globals)
+                    exec_globals = _EXEC_GLOBALS_TEMPLATE.copy()
+                    _, code_obj = _compile_generate_fn(code, action_name)
+                    exec(code_obj, exec_globals)
                     generate_fns[action_name] = exec_globals.get("generate_fn")
                     
                     if generate_fns[action_name] is None:
@@ -443,23 +668,25 @@ def main(port: int, transport: str) -> int:
                         text=f"Error executing generate function code for action '{action_name}': {str(e)}"
                     )]
             
-            session.step_algorithm(generate_fns)
-            
-            nodes = session.state.tree.get_nodes()
-            state_score_pairs = session.get_state_score_pairs()
-            
+            # step_algorithm runs user generate functions and can be CPU-heavy;
+            # offload it so the event loop keeps serving other MCP requests.
+            async with session.step_lock:
+                await anyio.to_thread.run_sync(session.step_algorithm, generate_fns)
+
+            # Counts come from the cached tree size; materializing every node
+            # via get_nodes() just to take len() re-traverses the tree each step.
             result = {
                 "session_id": session_id,
                 "step_count": session.step_count,
-                "total_nodes": len(nodes),
-                "non_root_nodes": len(state_score_pairs),
-                "tree_size": len(session.state.tree),
+                "total_nodes": session.node_count,
+                "non_root_nodes": session.node_count - 1,
+                "tree_size": session.node_count,
                 "status": "step_completed"
             }
             
             return [types.TextContent(
                 type="text",
-                text=json.dumps(result, indent=2)
+                text=_dump(result)
             )]
             
         except RuntimeError as e:
@@ -476,7 +703,8 @@ def main(port: int, transport: str) -> int:
     async def get_tree_state_tool(arguments: dict) -> list[types.ContentBlock]:
         """Get current tree state and statistics."""
         session_id = arguments["session_id"]
-        
+        max_state_chars = arguments.get("max_state_chars", DEFAULT_MAX_STATE_CHARS)
+
         session_error = _validate_session_exists(session_id)
         if session_error:
             return [types.TextContent(
@@ -485,30 +713,33 @@ def main(port: int, transport: str) -> int:
             )]
         
         session = sessions[session_id]
+        _touch_session(session_id)
         
         try:
-            nodes = session.state.tree.get_nodes()
             state_score_pairs = session.get_state_score_pairs()
-            
-            serializable_pairs = []
-            for state, score in state_score_pairs:
-                serializable_pairs.append({
-                    "state": str(state),
+
+            # Truncation keeps megabyte-scale states from dominating the
+            # serialization and transport cost.
+            serializable_pairs = [
+                {
+                    "state": _serialize_state(state, max_state_chars),
                     "score": float(score)
-                })
+                }
+                for state, score in state_score_pairs
+            ]
             
             result = {
                 "session_id": session_id,
                 "algorithm": session.algorithm_name,
                 "step_count": session.step_count,
-                "total_nodes": len(nodes),
-                "tree_size": len(session.state.tree),
+                "total_nodes": session.node_count,
+                "tree_size": session.node_count,
                 "state_score_pairs": serializable_pairs
             }
             
             return [types.TextContent(
                 type="text",
-                text=json.dumps(result, indent=2)
+                text=_dump(result)
             )]
             
         except Exception as e:
@@ -521,6 +752,7 @@ def main(port: int, transport: str) -> int:
         """Get top-k nodes using ranking functionality."""
         session_id = arguments["session_id"]
         k = arguments.get("k", 10)
+        max_state_chars = arguments.get("max_state_chars", DEFAULT_MAX_STATE_CHARS)
         
         session_error = _validate_session_exists(session_id)
         if session_error:
@@ -542,23 +774,26 @@ def main(port: int, transport: str) -> int:
             )]
         
         session = sessions[session_id]
+        _touch_session(session_id)
         
         try:
-            nodes = session.state.tree.get_nodes()
-            if len(nodes) <= 1:  # Only root node
+            if session.node_count <= 1:  # Only root node
                 return [types.TextContent(
                     type="text",
                     text="Warning: Tree has no non-root nodes to rank. Perform tree steps first."
                 )]
             
-            top_results = tq.top_k(session.state, session.algorithm, k=k)
+            top_results = await anyio.to_thread.run_sync(
+                partial(_top_k_pairs, session.state, session.algorithm, k)
+            )
             
-            serializable_results = []
-            for state, score in top_results:
-                serializable_results.append({
-                    "state": str(state),
+            serializable_results = [
+                {
+                    "state": _serialize_state(state, max_state_chars),
                     "score": float(score)
-                })
+                }
+                for state, score in top_results
+            ]
             
             result = {
                 "session_id": session_id,
@@ -569,7 +804,7 @@ def main(port: int, transport: str) -> int:
             
             return [types.TextContent(
                 type="text",
-                text=json.dumps(result, indent=2)
+                text=_dump(result)
             )]
             
         except Exception as e:
@@ -580,39 +815,36 @@ def main(port: int, transport: str) -> int:
 
     async def list_sessions_tool(arguments: dict) -> list[types.ContentBlock]:
         """List all active sessions."""
-        async with sessions_lock:
-            session_list = []
-            for session_id, session in sessions.items():
-                session_list.append({
-                    "session_id": session_id,
-                    "algorithm": session.algorithm_name,
-                    "step_count": session.step_count,
-                    "tree_size": len(session.state.tree)
-                })
-            
-            result = {
-                "active_sessions": len(sessions),
-                "sessions": session_list
-            }
-        
+        snapshot = list(sessions.items())
+        session_list = []
+        for session_id, session in snapshot:
+            session_list.append({
+                "session_id": session_id,
+                "algorithm": session.algorithm_name,
+                "step_count": session.step_count,
+                "tree_size": len(session.state.tree)
+            })
+
+        result = {
+            "active_sessions": len(snapshot),
+            "sessions": session_list
+        }
+
         return [types.TextContent(
             type="text",
-            text=json.dumps(result, indent=2)
+            text=_dump(result)
         )]
 
     async def delete_session_tool(arguments: dict) -> list[types.ContentBlock]:
         """Delete a session."""
         session_id = arguments["session_id"]
         
-        async with sessions_lock:
-            if session_id not in sessions:
-                return [types.TextContent(
-                    type="text",
-                    text=f"Error: Session {session_id} not found"
-                )]
-            
-            del sessions[session_id]
-        
+        if sessions.pop(session_id, None) is None:
+            return [types.TextContent(
+                type="text",
+                text=f"Error: Session {session_id} not found"
+            )]
+
         result = {
             "session_id": session_id,
             "status": "deleted"
@@ -620,7 +852,7 @@ def main(port: int, transport: str) -> int:
         
         return [types.TextContent(
             type="text",
-            text=json.dumps(result, indent=2)
+            text=_dump(result)
         )]
 
     async def get_tree_visualization_tool(arguments: dict) -> list[types.ContentBlock]:
@@ -639,38 +871,55 @@ def main(port: int, transport: str) -> int:
             )]
         
         session = sessions[session_id]
+        _touch_session(session_id)
         
         try:
-            from treequest.visualization import visualize_tree_graphviz
-            
-            dot = visualize_tree_graphviz(
-                tree=session.state.tree,
-                save_path=None,  # Don't save to file, just return the dot object
-                show_scores=show_scores,
-                max_label_length=max_label_length,
-                title=title,
-                format=format_type
-            )
-            
-            if dot is None:
-                return [types.TextContent(
-                    type="text",
-                    text="Error: Graphviz executable not found. Please install Graphviz to use visualization."
-                )]
-            
-            dot_source = dot.source
-            
+            if format_type == "dot":
+                # Only the textual source is needed; build it directly
+                # without constructing a graphviz.Digraph per node/edge.
+                from treequest.visualization import visualize_tree_dot
+
+                dot_source = visualize_tree_dot(
+                    tree=session.state.tree,
+                    show_scores=show_scores,
+                    max_label_length=max_label_length,
+                    title=title,
+                )
+            else:
+                from treequest.visualization import visualize_tree_graphviz
+
+                # Graphviz layout can shell out and block; run it off the loop.
+                dot = await anyio.to_thread.run_sync(
+                    partial(
+                        visualize_tree_graphviz,
+                        tree=session.state.tree,
+                        save_path=None,  # Don't save to file, just return the dot object
+                        show_scores=show_scores,
+                        max_label_length=max_label_length,
+                        title=title,
+                        format=format_type,
+                    )
+                )
+
+                if dot is None:
+                    return [types.TextContent(
+                        type="text",
+                        text="Error: Graphviz executable not found. Please install Graphviz to use visualization."
+                    )]
+
+                dot_source = dot.source
+
             result = {
                 "session_id": session_id,
                 "format": format_type,
                 "dot_source": dot_source,
-                "node_count": len(session.state.tree.get_nodes()),
+                "node_count": session.node_count,
                 "visualization_generated": True
             }
             
             return [types.TextContent(
                 type="text",
-                text=json.dumps(result, indent=2)
+                text=_dump(result)
             )]
             
         except ImportError:
@@ -684,6 +933,18 @@ def main(port: int, transport: str) -> int:
                 text=f"Error generating visualization: {str(e)}"
             )]
 
+    # Single dispatch table shared by call_tool; adding a tool means adding
+    # one entry here plus its schema in _TOOLS.
+    tool_handlers = {
+        "init_tree": init_tree_tool,
+        "step_tree": step_tree_tool,
+        "get_tree_state": get_tree_state_tool,
+        "rank_nodes": rank_nodes_tool,
+        "list_sessions": list_sessions_tool,
+        "delete_session": delete_session_tool,
+        "get_tree_visualization": get_tree_visualization_tool,
+    }
+
     if transport == "sse":
         from mcp.server.sse import SseServerTransport
         from starlette.applications import Starlette
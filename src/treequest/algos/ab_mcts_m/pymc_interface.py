@@ -80,21 +80,23 @@ class Observation:
     ) -> None:
         """
         A helper method to collect all the observations (including the one of the current node) to list.
-        """
-        if parent.expand_idx in all_observations:
-            observation = replace(
-                all_observations[parent.expand_idx], child_idx=child_idx_override
-            )
-            observations.append(observation)
 
-        for child_idx, child in enumerate(parent.children):
-            if child.expand_idx in all_observations:
-                cls.collect_all_observations(
-                    child,
-                    all_observations,
-                    child_idx_override=child_idx_override,
-                    observations=observations,
+        Implemented as an explicit-stack preorder walk so deep trees neither
+        pay Python call overhead per node nor hit the recursion limit.
+        """
+        stack = [parent]
+        while stack:
+            node = stack.pop()
+            if node.expand_idx in all_observations:
+                observation = replace(
+                    all_observations[node.expand_idx], child_idx=child_idx_override
                 )
+                observations.append(observation)
+            # Reversed push keeps left-to-right child order; subtrees whose
+            # root has no observation are skipped entirely, as before.
+            for child in reversed(node.children):
+                if child.expand_idx in all_observations:
+                    stack.append(child)
 
 
 @dataclass
@@ -3,7 +3,7 @@ import dataclasses
 from collections.abc import Mapping
 from dataclasses import dataclass
 from heapq import heappop, heappush
-from typing import Generic, List, Tuple, TypeVar
+from typing import Dict, Generic, List, Optional, Tuple, TypeVar
 
 from treequest.algos.base import Algorithm
 from treequest.algos.tree import Node, Tree
@@ -48,6 +48,25 @@ class BFSState(Generic[StateT]):
         default_factory=TrialStoreWithNodeQueue[StateT]
     )
 
+    # Lazily computed leaf ranking, invalidated whenever `leaves` mutates.
+    _rank_cache: Optional[Dict[int, int]] = dataclasses.field(
+        default=None, repr=False, compare=False
+    )
+
+    @property
+    def rank_by_expand_idx(self) -> Dict[int, int]:
+        """1-indexed priority rank of each leaf, keyed by node expand_idx.
+
+        Computed once per state mutation, so repeated lookups (e.g. during a
+        visualization snapshot build) cost O(1) instead of a sort per query.
+        """
+        if self._rank_cache is None:
+            self._rank_cache = {
+                item.node.expand_idx: rank
+                for rank, item in enumerate(sorted(self.leaves), 1)
+            }
+        return self._rank_cache
+
 
 class BestFirstSearchAlgo(Algorithm[StateT, BFSState[StateT]]):
     """
@@ -157,6 +176,7 @@ class BestFirstSearchAlgo(Algorithm[StateT, BFSState[StateT]]):
             else:
                 # Otherwise, pop the highest priority node from the heap
                 parent = heappop(state.leaves).node
+                state._rank_cache = None
 
             # Queue up nodes for expansion
             # For each selected node, we generate num_samples * len(actions) new nodes
@@ -195,6 +215,7 @@ class BestFirstSearchAlgo(Algorithm[StateT, BFSState[StateT]]):
 
         # Add the new node to the priority queue
         heappush(state.leaves, BFSHeapItem(node=new_node, score=new_score))
+        state._rank_cache = None
 
         state.trial_store.advance_queue(finished_trial.action, parent_node)
         return state
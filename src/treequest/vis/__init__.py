@@ -36,7 +36,7 @@ Example usage:
 
 from treequest.vis.algo_adapters import register_adapter
 from treequest.vis.build_snapshot import build_snapshot
-from treequest.vis.render import render
+from treequest.vis.render import render, render_all
 from treequest.vis.errors import (
     DependencyNotFoundError,
     InvalidStateError,
@@ -44,12 +44,6 @@ from treequest.vis.errors import (
     SecurityWarning,
     VisualizationError,
 )
-from treequest.vis.renderers import (
-    dump_snapshot,
-    render_graphviz,
-    render_html,
-    render_mermaid,
-)
 from treequest.vis.snapshot import (
     EdgeSnapshot,
     NodeSnapshot,
@@ -60,6 +54,7 @@ from treequest.vis.snapshot import (
 __all__ = [
     # High-level API
     "render",
+    "render_all",
     "build_snapshot",
     # Low-level renderers
     "render_graphviz",
@@ -80,3 +75,24 @@ __all__ = [
     # Adapter registration
     "register_adapter",
 ]
+
+# Renderer entry points are re-exported lazily (PEP 562): they pull in heavy
+# optional dependencies (graphviz, jinja2, yaml) that plain `import treequest`
+# should not pay for.
+_LAZY_RENDERERS = frozenset(
+    ["render_graphviz", "render_html", "render_mermaid", "dump_snapshot"]
+)
+
+
+def __getattr__(name: str):
+    if name in _LAZY_RENDERERS:
+        import treequest.vis.renderers as renderers
+
+        value = getattr(renderers, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
@@ -28,6 +28,11 @@ if _ab_mcts_m_import.is_successful():
 
     _ADAPTER_REGISTRY["ABMCTSMState"] = ABMCTSMAdapter()
 
+# Lazily populated lookup keyed by the concrete state type, so repeated
+# get_adapter calls skip the __name__/string-registry indirection. A None
+# entry records a miss that has already been warned about.
+_ADAPTER_TYPE_CACHE: Dict[type, Optional[VisualizerAdapter]] = {}
+
 
 def register_adapter(state_type_name: str, adapter: VisualizerAdapter) -> None:
     """
@@ -42,6 +47,8 @@ def register_adapter(state_type_name: str, adapter: VisualizerAdapter) -> None:
             f"Adapter for state type '{state_type_name}' is already registered. Overwriting."
         )
     _ADAPTER_REGISTRY[state_type_name] = adapter
+    # Cached lookups (including recorded misses) may now be stale.
+    _ADAPTER_TYPE_CACHE.clear()
 
 
 def get_adapter(algo_state: StateT) -> Optional[VisualizerAdapter]:
@@ -54,15 +61,17 @@ def get_adapter(algo_state: StateT) -> Optional[VisualizerAdapter]:
     Returns:
         Adapter instance or None if no adapter is registered
     """
-    state_type_name = type(algo_state).__name__
+    state_type = type(algo_state)
+    if state_type in _ADAPTER_TYPE_CACHE:
+        return _ADAPTER_TYPE_CACHE[state_type]
 
     # Check registry first
-    if state_type_name in _ADAPTER_REGISTRY:
-        return _ADAPTER_REGISTRY[state_type_name]
-
-    # No adapter found - return a default that returns empty metrics
-    warnings.warn(
-        f"No adapter found for state type '{state_type_name}'. Visualization may be limited.\n"
-        "Consider implementing VisualizerAdapter protocol for this state type and registering it via register_adapter()."
-    )
-    return None
+    adapter = _ADAPTER_REGISTRY.get(state_type.__name__)
+    if adapter is None:
+        # No adapter found - warn once per state type
+        warnings.warn(
+            f"No adapter found for state type '{state_type.__name__}'. Visualization may be limited.\n"
+            "Consider implementing VisualizerAdapter protocol for this state type and registering it via register_adapter()."
+        )
+    _ADAPTER_TYPE_CACHE[state_type] = adapter
+    return adapter
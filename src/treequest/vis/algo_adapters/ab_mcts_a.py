@@ -1,11 +1,12 @@
 """Visualization adapter for ABMCTSA algorithm."""
 
 import math
-from typing import Any, Dict, TypeVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
 
 from treequest.algos.ab_mcts_a.algo import ABMCTSAAlgoState
 from treequest.algos.ab_mcts_a.prob_state import ProbabilisticDist
 from treequest.algos.tree import Node
+from treequest.vis.algo_adapters.base import _LazyHTML
 
 StateT = TypeVar("StateT")
 
@@ -21,84 +22,117 @@ def probabilistic_dist_to_str(probabilistic_dist: ProbabilisticDist) -> str:
         return "Unknown Distribution"
 
 
+_DistFormatter = Callable[[ProbabilisticDist], str]
+
+
+def _emit_stack_tree(thompson_state: Any, fmt: _DistFormatter) -> Iterator[str]:
+    """Yield HTML chunks for the "stack" strategy in document order."""
+    yield "<ul>"
+    for action, probabilistic_dist in thompson_state.action_probas.items():
+        yield f"<li>{action} ~ {fmt(probabilistic_dist)}<ul>"
+        yield f"<li>GEN ~ {fmt(thompson_state.gen_vs_cont_probas[action]['GEN'])}</li>"
+        yield f"<li>CONT ~ {fmt(thompson_state.gen_vs_cont_probas[action]['CONT'])}<ul>"
+        for node_id, node_dist in thompson_state.node_probas[action].items():
+            yield f"<li>{node_id} ~ {fmt(node_dist)}</li>"
+        yield "</ul></li></ul></li>"
+    yield "</ul>"
+
+
+def _emit_thompson_tree(
+    thompson_state: Any, algo_state: "ABMCTSAAlgoState[StateT]", fmt: _DistFormatter
+) -> Iterator[str]:
+    """Yield HTML chunks for the "multiarm_bandit_thompson" strategy."""
+    yield "<ul>"
+    yield f"<li>GEN ~ {fmt(thompson_state.gen_vs_cont_probas['shared']['GEN'])}<ul>"
+    for action in algo_state.all_rewards_store.keys():
+        # The prior dist is a throwaway object, so bypass the id()-keyed cache.
+        yield f"<li>{action} ~ {probabilistic_dist_to_str(ProbabilisticDist(thompson_state.prior_for_actions[action]))}</li>"
+    yield f"</ul></li><li>CONT ~ {fmt(thompson_state.gen_vs_cont_probas['shared']['CONT'])}<ul>"
+    for action, probabilistic_dist in thompson_state.node_probas["shared"].items():
+        yield f"<li>{action} ~ {fmt(probabilistic_dist)}</li>"
+    yield "</ul></li>"
+
+
+def _emit_ucb_tree(
+    thompson_state: Any, algo_state: "ABMCTSAAlgoState[StateT]", fmt: _DistFormatter
+) -> Iterator[str]:
+    """Yield HTML chunks for the "multiarm_bandit_ucb" strategy."""
+    all_len = sum(len(scores) for scores in algo_state.all_rewards_store.values())
+    # Constant across actions; keep the transcendental call out of the loop.
+    log_all_len = math.log(all_len)
+    yield "<ul>"
+    yield f"<li>GEN ~ {fmt(thompson_state.gen_vs_cont_probas['shared']['GEN'])}<ul>"
+    for action, scores in algo_state.all_rewards_store.items():
+        yield f"<li>{action}: UCB Score = {sum(scores) / len(scores) + math.sqrt(2 * log_all_len / len(scores))}</li>"
+    yield f"</ul></li><li>CONT ~ {fmt(thompson_state.gen_vs_cont_probas['shared']['CONT'])}<ul>"
+    for action, probabilistic_dist in thompson_state.node_probas["shared"].items():
+        yield f"<li>{action} ~ {fmt(probabilistic_dist)}</li>"
+    yield "</ul></li>"
+
+
 class ABMCTSAAdapter:
     """Adapter for ABMCTSA algorithm."""
 
+    # The root carries a Thompson state describing the first action choice.
+    supports_root = True
+
+    def __init__(self) -> None:
+        # Memoized dist-string table for the algo state last seen: the same
+        # ProbabilisticDist objects recur across nodes (shared GEN/CONT
+        # entries), so format each at most once per snapshot build. The entry
+        # pins algo_state itself — that keeps its dist objects alive, which is
+        # what makes the id()-keyed table below sound (a collected dist's id
+        # could otherwise be reused by an unrelated object).
+        self._dist_str_cache: Optional[
+            Tuple[ABMCTSAAlgoState[Any], int, Dict[int, str]]
+        ] = None
+
+    def _dist_formatter(
+        self, algo_state: ABMCTSAAlgoState[StateT]
+    ) -> _DistFormatter:
+        tree_size = len(algo_state.tree)
+        if (
+            self._dist_str_cache is None
+            or self._dist_str_cache[0] is not algo_state
+            or self._dist_str_cache[1] != tree_size
+        ):
+            self._dist_str_cache = (algo_state, tree_size, {})
+        cache = self._dist_str_cache[2]
+
+        def fmt(probabilistic_dist: ProbabilisticDist) -> str:
+            text = cache.get(id(probabilistic_dist))
+            if text is None:
+                text = probabilistic_dist_to_str(probabilistic_dist)
+                cache[id(probabilistic_dist)] = text
+            return text
+
+        return fmt
+
     def extract_node_metrics(
         self, algo_state: ABMCTSAAlgoState[StateT], node: Node[StateT]
     ) -> Dict[str, Any]:
         """Extract ABMCTSA-specific metrics for a node."""
 
-        if not isinstance(algo_state, ABMCTSAAlgoState):
+        if type(algo_state) is not ABMCTSAAlgoState:
             return {}
         thompson_state = algo_state.thompson_states.get(node)
         if thompson_state is None:
             return {}  # No metrics available
-        action_probas = None
+        fmt = self._dist_formatter(algo_state)
+        # A single join over a flat chunk generator keeps allocation linear in
+        # the output size, instead of re-concatenating at every nesting level.
+        # Wrapped in _LazyHTML so the join only runs if the value is rendered.
         if thompson_state.model_selection_strategy == "stack":
-            action_probas = (
-                "<ul>"
-                + "".join(
-                    [
-                        f"<li>{action} ~ {probabilistic_dist_to_str(probabilistic_dist)}<ul>"
-                        + f"<li>GEN ~ {probabilistic_dist_to_str(thompson_state.gen_vs_cont_probas[action]['GEN'])}</li>"
-                        + f"<li>CONT ~ {probabilistic_dist_to_str(thompson_state.gen_vs_cont_probas[action]['CONT'])}<ul>"
-                        + "".join(
-                            [
-                                f"<li>{node_id} ~ {probabilistic_dist_to_str(probabilistic_dist)}</li>"
-                                for node_id, probabilistic_dist in thompson_state.node_probas[
-                                    action
-                                ].items()
-                            ]
-                        )
-                        + "</ul></li></ul></li>"
-                        for action, probabilistic_dist in thompson_state.action_probas.items()
-                    ]
-                )
-                + "</ul>"
+            action_probas = _LazyHTML(
+                lambda: "".join(_emit_stack_tree(thompson_state, fmt))
             )
         elif thompson_state.model_selection_strategy == "multiarm_bandit_thompson":
-            action_probas = "<ul>" + (
-                f"<li>GEN ~ {probabilistic_dist_to_str(thompson_state.gen_vs_cont_probas['shared']['GEN'])}<ul>"
-                + "".join(
-                    [
-                        f"<li>{action} ~ {probabilistic_dist_to_str(ProbabilisticDist(thompson_state.prior_for_actions[action]))}</li>"
-                        for action in algo_state.all_rewards_store.keys()
-                    ]
-                )
-                + f"</ul></li><li>CONT ~ {probabilistic_dist_to_str(thompson_state.gen_vs_cont_probas['shared']['CONT'])}<ul>"
-                + "".join(
-                    [
-                        f"<li>{action} ~ {probabilistic_dist_to_str(probabilistic_dist)}</li>"
-                        for action, probabilistic_dist in thompson_state.node_probas[
-                            "shared"
-                        ].items()
-                    ]
-                )
-                + "</ul></li>"
+            action_probas = _LazyHTML(
+                lambda: "".join(_emit_thompson_tree(thompson_state, algo_state, fmt))
             )
         elif thompson_state.model_selection_strategy == "multiarm_bandit_ucb":
-            all_len = sum(
-                len(scores) for scores in algo_state.all_rewards_store.values()
-            )
-            action_probas = "<ul>" + (
-                f"<li>GEN ~ {probabilistic_dist_to_str(thompson_state.gen_vs_cont_probas['shared']['GEN'])}<ul>"
-                + "".join(
-                    [
-                        f"<li>{action}: UCB Score = {sum(scores) / len(scores) + math.sqrt(2 * math.log(all_len) / len(scores))}</li>"
-                        for action, scores in algo_state.all_rewards_store.items()
-                    ]
-                )
-                + f"</ul></li><li>CONT ~ {probabilistic_dist_to_str(thompson_state.gen_vs_cont_probas['shared']['CONT'])}<ul>"
-                + "".join(
-                    [
-                        f"<li>{action} ~ {probabilistic_dist_to_str(probabilistic_dist)}</li>"
-                        for action, probabilistic_dist in thompson_state.node_probas[
-                            "shared"
-                        ].items()
-                    ]
-                )
-                + "</ul></li>"
+            action_probas = _LazyHTML(
+                lambda: "".join(_emit_ucb_tree(thompson_state, algo_state, fmt))
             )
         else:  # Not reachable
             raise ValueError(
@@ -107,10 +141,19 @@ class ABMCTSAAdapter:
         return {
             "action_probas": {
                 "display_name": "Action Probabilities",
-                "display_value": action_probas if action_probas is not None else "N/A",
+                "display_value": action_probas,
             },
         }
 
+    def extract_all_metrics(
+        self, algo_state: ABMCTSAAlgoState[StateT], nodes: List[Node[StateT]]
+    ) -> Dict[int, Dict[str, Any]]:
+        """Extract ABMCTSA-specific metrics for all nodes in one pass."""
+        return {
+            node.expand_idx: self.extract_node_metrics(algo_state, node)
+            for node in nodes
+        }
+
     def get_algorithm_name(self, algo_state: ABMCTSAAlgoState[StateT]) -> str:
         """Get algorithm name."""
         return "ABMCTSA"
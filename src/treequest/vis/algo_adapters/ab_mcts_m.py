@@ -1,78 +1,328 @@
 """Visualization adapter for ABMCTSM algorithm."""
 
 import math
-import statistics
-from collections import defaultdict
-from typing import Any, Dict, TypeVar
+from typing import Any, Dict, List, Optional, Tuple, TypeVar
+
+import numpy as np
+
+try:
+    import numexpr as ne  # type: ignore[import-untyped]
+except ImportError:
+    ne = None
 
 from treequest.algos.ab_mcts_m.algo import ABMCTSMState
-from treequest.algos.ab_mcts_m.pymc_interface import (
-    Observation,
-    PruningConfig,
-    is_prunable,
-)
+from treequest.algos.ab_mcts_m.pymc_interface import PruningConfig
 from treequest.algos.tree import Node
+from treequest.vis.algo_adapters.base import _LazyHTML
+
+try:
+    from numba import njit  # type: ignore[import-untyped]
+except ImportError:
+    # Fall back to running the kernel as plain Python over NumPy arrays.
+    def njit(*args, **kwargs):  # type: ignore[misc]
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
 
 StateT = TypeVar("StateT")
 
+# Aggregated per-node tables, shared across all extract_node_metrics calls for
+# one algo state: positions are postorder indices into the flattened tree.
+_Tables = Tuple[
+    Dict[int, int],  # expand_idx -> position
+    List[str],  # sorted action names
+    np.ndarray,  # (n, n_actions) reward sums of gated child subtrees
+    np.ndarray,  # (n, n_actions) reward counts of gated child subtrees
+    np.ndarray,  # (n, max_children) reward sums by child slot
+    np.ndarray,  # (n, max_children) reward counts by child slot
+    np.ndarray,  # (n,) prunable flags
+    float,  # log(total observations)
+]
+
+
+@njit(cache=True)
+def _aggregate_kernel(
+    child_start,
+    child_positions,
+    has_obs,
+    obs_action,
+    obs_reward,
+    obs_score,
+    n_actions,
+    n_scores,
+    max_children,
+    min_subtree_size,
+    same_score_threshold,
+):  # pragma: no cover - exercised via _get_subtree_tables
+    """Bottom-up observation aggregation over the flattened tree.
+
+    Nodes are indexed in postorder (children before parents), so a single
+    forward pass can merge each gated child subtree's contribution into its
+    parent. Mirrors the gating in Observation.collect_all_observations: a
+    child subtree only contributes if the child node itself has an
+    observation.
+    """
+    n = has_obs.shape[0]
+    table_sum = np.zeros((n, n_actions), dtype=np.float64)
+    table_cnt = np.zeros((n, n_actions), dtype=np.int64)
+    child_sum = np.zeros((n, max_children), dtype=np.float64)
+    child_cnt = np.zeros((n, max_children), dtype=np.int64)
+    score_cnt = np.zeros((n, n_scores), dtype=np.int64)
+    contrib_sum = np.zeros((n, n_actions), dtype=np.float64)
+    contrib_cnt = np.zeros((n, n_actions), dtype=np.int64)
+    contrib_score = np.zeros((n, n_scores), dtype=np.int64)
+    prunable = np.zeros(n, dtype=np.bool_)
+
+    for p in range(n):
+        for ci in range(child_start[p], child_start[p + 1]):
+            c = child_positions[ci]
+            if not has_obs[c]:
+                continue
+            slot = ci - child_start[p]
+            total = 0.0
+            count = 0
+            for a in range(n_actions):
+                table_sum[p, a] += contrib_sum[c, a]
+                table_cnt[p, a] += contrib_cnt[c, a]
+                total += contrib_sum[c, a]
+                count += contrib_cnt[c, a]
+            child_sum[p, slot] = total
+            child_cnt[p, slot] = count
+            for s in range(n_scores):
+                score_cnt[p, s] += contrib_score[c, s]
+
+        # Same criterion as pymc_interface.is_prunable, evaluated on the
+        # score counts carried up by the traversal.
+        score_total = 0
+        score_max = 0
+        for s in range(n_scores):
+            score_total += score_cnt[p, s]
+            if score_cnt[p, s] > score_max:
+                score_max = score_cnt[p, s]
+        if score_total >= min_subtree_size:
+            prunable[p] = score_max >= same_score_threshold * score_total
+
+        # This node's contribution to its parent: the merged child tables
+        # plus its own observation.
+        for a in range(n_actions):
+            contrib_sum[p, a] = table_sum[p, a]
+            contrib_cnt[p, a] = table_cnt[p, a]
+        for s in range(n_scores):
+            contrib_score[p, s] = score_cnt[p, s]
+        if has_obs[p]:
+            contrib_sum[p, obs_action[p]] += obs_reward[p]
+            contrib_cnt[p, obs_action[p]] += 1
+            contrib_score[p, obs_score[p]] += 1
+
+    return table_sum, table_cnt, child_sum, child_cnt, prunable
+
 
 class ABMCTSMAdapter:
     """Adapter for ABMCTSM algorithm."""
 
+    # Root metrics aggregate the whole tree's observations; keep them.
+    supports_root = True
+
     def __init__(self) -> None:
         # Used only for the (optional) prune hint shown to users
         self._default_pruning_config = PruningConfig()
+        # Memoized subtree aggregation for the algo state last seen. Collecting
+        # descendant observations per node re-walks each subtree, which is
+        # quadratic when build_snapshot queries every node; one pass over the
+        # flattened tree produces the tables for all nodes at once. The entry
+        # pins algo_state itself and is matched by identity, so a new state
+        # reusing a freed state's id can never hit a stale entry.
+        self._tables_cache: Optional[
+            Tuple[ABMCTSMState[Any], Tuple[int, int], _Tables]
+        ] = None
+
+    def _get_subtree_tables(self, algo_state: ABMCTSMState[StateT]) -> _Tables:
+        """Return per-node observation aggregates for the whole tree."""
+        all_observations = algo_state.all_observations
+        key = (len(all_observations), len(algo_state.tree))
+        if (
+            self._tables_cache is not None
+            and self._tables_cache[0] is algo_state
+            and self._tables_cache[1] == key
+        ):
+            return self._tables_cache[2]
+
+        config = self._default_pruning_config
+        log_total = math.log(len(all_observations)) if all_observations else 0.0
+
+        # Flatten the tree in postorder (children before parents) with a CSR
+        # layout for the child lists.
+        ordered: List[Node[StateT]] = []
+        stack: List[Node[StateT]] = [algo_state.tree.root]
+        while stack:
+            current = stack.pop()
+            ordered.append(current)
+            stack.extend(current.children)
+        ordered.reverse()
+        n = len(ordered)
+        pos_by_expand_idx = {node.expand_idx: p for p, node in enumerate(ordered)}
+
+        max_children = max((len(node.children) for node in ordered), default=0)
+        child_start = np.zeros(n + 1, dtype=np.int64)
+        child_positions = np.empty(
+            sum(len(node.children) for node in ordered), dtype=np.int64
+        )
+        offset = 0
+        for p, node in enumerate(ordered):
+            child_start[p] = offset
+            for child in node.children:
+                child_positions[offset] = pos_by_expand_idx[child.expand_idx]
+                offset += 1
+        child_start[n] = offset
+
+        # Flatten observations to parallel arrays; np.unique both
+        # integer-encodes the action names and yields them sorted.
+        n_obs = len(all_observations)
+        obs_pos = np.fromiter(
+            (pos_by_expand_idx[idx] for idx in all_observations),
+            dtype=np.int64,
+            count=n_obs,
+        )
+        rewards = np.fromiter(
+            (obs.reward for obs in all_observations.values()),
+            dtype=np.float64,
+            count=n_obs,
+        )
+        unique_actions, action_inverse = np.unique(
+            [obs.action for obs in all_observations.values()], return_inverse=True
+        )
+        action_names = list(unique_actions)
+        has_obs = np.zeros(n, dtype=np.bool_)
+        obs_action = np.zeros(n, dtype=np.int64)
+        obs_reward = np.zeros(n, dtype=np.float64)
+        rounded = np.zeros(n, dtype=np.int64)
+        has_obs[obs_pos] = True
+        obs_action[obs_pos] = action_inverse
+        obs_reward[obs_pos] = rewards
+        rounded[obs_pos] = np.rint(rewards * 100).astype(np.int64)
+        # Dense score ids for the prunability counter (scores are rewards
+        # rounded to two decimals, as in pymc_interface.is_prunable).
+        score_values = np.unique(rounded[obs_pos]) if n_obs else rounded[:1]
+        obs_score = np.searchsorted(score_values, rounded)
+
+        table_sum, table_cnt, child_sum, child_cnt, prunable = _aggregate_kernel(
+            child_start,
+            child_positions,
+            has_obs,
+            obs_action,
+            obs_reward,
+            obs_score,
+            max(len(action_names), 1),
+            len(score_values),
+            max(max_children, 1),
+            config.min_subtree_size_for_pruning,
+            config.same_score_proportion_threshold,
+        )
+
+        tables: _Tables = (
+            pos_by_expand_idx,
+            action_names,
+            table_sum,
+            table_cnt,
+            child_sum,
+            child_cnt,
+            prunable,
+            log_total,
+        )
+        self._tables_cache = (algo_state, key, tables)
+        return tables
 
     def extract_node_metrics(
         self, algo_state: ABMCTSMState[StateT], node: Node[StateT]
     ) -> Dict[str, Any]:
         """Extract ABMCTSM-specific metrics for a node."""
 
-        if not isinstance(algo_state, ABMCTSMState):
+        if type(algo_state) is not ABMCTSMState:
             return {}
-        # Subtree observations under this node (excluding the node itself)
-        observations = Observation.collect_all_observations_of_descendant(
-            node, algo_state.all_observations
-        )
-        if len(observations) == 0:
+        (
+            pos_by_expand_idx,
+            action_names,
+            table_sum,
+            table_cnt,
+            child_sum,
+            child_cnt,
+            prunable,
+            log_total,
+        ) = self._get_subtree_tables(algo_state)
+        p = pos_by_expand_idx[node.expand_idx]
+        action_mask = table_cnt[p] > 0
+        if not action_mask.any():
             return {}
-        prunable = is_prunable(node, observations, self._default_pruning_config)
-        rewards_by_action = defaultdict(list)
-        rewards_by_child = defaultdict(list)
-        for obs in observations:
-            rewards_by_action[obs.action].append(obs.reward)
-            if obs.child_idx >= 0:
-                rewards_by_child[obs.child_idx].append(obs.reward)
-        ucb_scores = {
-            action: statistics.mean(rewards)
-            + math.sqrt(2 * math.log(len(algo_state.all_observations)) / len(rewards))
-            for action, rewards in rewards_by_action.items()
-        }
+
+        def build_rewards_by_action() -> str:
+            counts = table_cnt[p][action_mask]
+            means = table_sum[p][action_mask] / counts
+            if ne is not None:
+                # numexpr fuses the expression into a single pass.
+                ucb_scores = ne.evaluate(
+                    "means + sqrt(2 * log_total / counts)",
+                    local_dict={
+                        "means": means,
+                        "counts": counts,
+                        "log_total": log_total,
+                    },
+                )
+            else:
+                ucb_scores = means + np.sqrt(2 * log_total / counts)
+            actions = [action_names[i] for i in np.nonzero(action_mask)[0]]
+            # Batch the float formatting instead of one f-string per value.
+            means_str = np.char.mod("%.3f", means)
+            ucb_str = np.char.mod("%.3f", ucb_scores)
+            return (
+                "<ul>"
+                + "".join(
+                    f"<li>{action}: len = {counts[i]}, mean = {means_str[i]}, UCB Score = {ucb_str[i]}</li>"
+                    for i, action in enumerate(actions)
+                )
+                + "</ul>"
+            )
+
+        def build_rewards_by_child() -> str:
+            child_mask = child_cnt[p] > 0
+            child_counts = child_cnt[p][child_mask]
+            child_means = child_sum[p][child_mask] / child_counts
+            child_idxs = np.nonzero(child_mask)[0]
+            means_str = np.char.mod("%.3f", child_means)
+            return (
+                "<ul>"
+                + "".join(
+                    f"<li>child #{child_idxs[i]}: n={child_counts[i]}, mean={means_str[i]}</li>"
+                    for i in range(len(child_idxs))
+                )
+                + "</ul>"
+            )
+
         return {
             "prunable": {
                 "display_name": "Prunable",
-                "display_value": "Yes" if prunable else "No",
+                "display_value": "Yes" if prunable[p] else "No",
             },
             "rewards_by_action": {
                 "display_name": "Rewards by Action",
-                "display_value": "<ul>"
-                + "".join(
-                    f"<li>{action}: len = {len(rewards)}, mean = {statistics.mean(rewards):.3f}, UCB Score = {ucb_scores[action]:.3f}</li>"
-                    for action, rewards in sorted(rewards_by_action.items())
-                )
-                + "</ul>",
+                # Deferred: formatting only happens if the value is rendered.
+                "display_value": _LazyHTML(build_rewards_by_action),
             },
             "rewards_by_child": {
                 "display_name": "Rewards by Child",
-                "display_value": "<ul>"
-                + "".join(
-                    f"<li>child #{child_idx}: n={len(rewards)}, mean={statistics.mean(rewards):.3f}</li>"
-                    for child_idx, rewards in sorted(rewards_by_child.items())
-                )
-                + "</ul>",
+                "display_value": _LazyHTML(build_rewards_by_child),
             },
         }
 
+    def extract_all_metrics(
+        self, algo_state: ABMCTSMState[StateT], nodes: List[Node[StateT]]
+    ) -> Dict[int, Dict[str, Any]]:
+        """Extract ABMCTSM-specific metrics for all nodes in one pass."""
+        return {
+            node.expand_idx: self.extract_node_metrics(algo_state, node)
+            for node in nodes
+        }
+
     def get_algorithm_name(self, algo_state: ABMCTSMState[StateT]) -> str:
         """Get algorithm name."""
         return "ABMCTSM"
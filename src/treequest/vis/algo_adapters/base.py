@@ -1,6 +1,6 @@
 """Base adapter protocol for extracting algorithm-specific metrics."""
 
-from typing import Any, Dict, Protocol, TypeVar
+from typing import Any, Callable, Dict, List, Optional, Protocol, TypeVar
 
 from treequest.algos.tree import Node
 
@@ -8,9 +8,38 @@ StateT = TypeVar("StateT")
 AlgoStateT = TypeVar("AlgoStateT", contravariant=True)
 
 
+class _LazyHTML:
+    """Deferred display_value whose HTML is built on first str() and cached.
+
+    Adapters wrap expensive HTML builders in this so renderers that never
+    show the value (metric-less dumps, label-only graphs) skip the
+    formatting work entirely.
+    """
+
+    __slots__ = ("_builder", "_value")
+
+    def __init__(self, builder: Callable[[], str]) -> None:
+        self._builder = builder
+        self._value: Optional[str] = None
+
+    def __str__(self) -> str:
+        if self._value is None:
+            self._value = self._builder()
+        return self._value
+
+    # Renderers may interpolate whole metric dicts (e.g. graphviz tooltips),
+    # which goes through repr(); show the built HTML there too instead of the
+    # default object repr with its memory address.
+    __repr__ = __str__
+
+
 class VisualizerAdapter(Protocol[StateT, AlgoStateT]):
     """Protocol for algorithm-specific metric extraction."""
 
+    # Whether the adapter produces meaningful metrics for the root node;
+    # snapshot builds skip the root entirely when False.
+    supports_root: bool
+
     def extract_node_metrics(
         self, algo_state: AlgoStateT, node: Node[StateT]
     ) -> Dict[str, Any]:
@@ -26,6 +55,41 @@ class VisualizerAdapter(Protocol[StateT, AlgoStateT]):
         """
         ...
 
+    def extract_all_metrics(
+        self, algo_state: AlgoStateT, nodes: List[Node[StateT]]
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Extract algorithm-specific metrics for all given nodes at once.
+
+        Adapters implement this so per-snapshot invariants are computed a
+        single time instead of once per node; callers that find the method
+        missing fall back to per-node extract_node_metrics calls.
+
+        Args:
+            algo_state: The algorithm state
+            nodes: The nodes to extract metrics for
+
+        Returns:
+            Mapping from node id (expand_idx) to that node's metrics
+        """
+        ...
+
+    def extract_global_metrics(self, algo_state: AlgoStateT) -> Dict[str, Any]:
+        """
+        Extract node-independent metrics for the whole snapshot.
+
+        These are stored once in the snapshot metadata instead of being
+        duplicated into every node's algo_metrics; callers that find the
+        method missing simply skip the global-metrics step.
+
+        Args:
+            algo_state: The algorithm state
+
+        Returns:
+            Dictionary of snapshot-wide metrics (may be empty)
+        """
+        ...
+
     def get_algorithm_name(self, algo_state: AlgoStateT) -> str:
         """
         Get the algorithm name from the state.
@@ -1,6 +1,7 @@
 """Visualization adapter for BestFirstSearch algorithm."""
 
-from typing import Any, Dict, TypeVar
+from operator import attrgetter
+from typing import Any, Dict, List, Optional, Tuple, TypeVar
 
 from treequest.algos.best_first_search import BFSState
 from treequest.algos.tree import Node
@@ -11,42 +12,74 @@ StateT = TypeVar("StateT")
 class BestFirstSearchAdapter:
     """Adapter for BestFirstSearch algorithm."""
 
+    # The root is never on the leaf heap, so its metrics are all N/A.
+    supports_root = False
+
+    def __init__(self) -> None:
+        # Memoized leaf ranking for the algo state last seen; build_snapshot
+        # calls extract_node_metrics once per node, and rebuilding the sorted
+        # leaf ranking for each of those calls is quadratic in tree size.
+        self._leaf_rank_cache: Optional[Tuple[int, int, Dict[int, int]]] = None
+
+    def _get_leaf_ranks(self, algo_state: BFSState[StateT]) -> Dict[int, int]:
+        """Return the leaf ranking table, computed once per algo state."""
+        # BFSState maintains the ranking itself; older state objects without
+        # the property fall back to a cached sort.
+        ranks = getattr(algo_state, "rank_by_expand_idx", None)
+        if ranks is not None:
+            return ranks
+
+        key = id(algo_state)
+        version = len(algo_state.leaves)
+        if (
+            self._leaf_rank_cache is not None
+            and self._leaf_rank_cache[0] == key
+            and self._leaf_rank_cache[1] == version
+        ):
+            return self._leaf_rank_cache[2]
+
+        leaf_ranks = {
+            item.node.expand_idx: rank
+            for rank, item in enumerate(
+                sorted(algo_state.leaves, key=attrgetter("sort_index")), 1
+            )
+        }
+        self._leaf_rank_cache = (key, version, leaf_ranks)
+        return leaf_ranks
+
     def extract_node_metrics(
         self, algo_state: BFSState[StateT], node: Node[StateT]
     ) -> Dict[str, Any]:
         """Extract BFS-specific metrics for a node."""
 
-        if not isinstance(algo_state, BFSState):
+        if type(algo_state) is not BFSState:
             return {}
-        leaf_indices = {
-            item.node.expand_idx: {
-                "rank": rank,
-                "score": item.score,
-                "depth": item.node.depth,
-            }
-            for rank, item in enumerate(
-                sorted(algo_state.leaves, key=lambda item: item.sort_index), 1
-            )
-        }
+        # Single .get: rank is None exactly when the node is not a leaf.
+        rank = self._get_leaf_ranks(algo_state).get(node.expand_idx)
         return {
             "is_leaf": {
                 "display_name": "Is Leaf Node",
-                "display_value": "Yes" if node.expand_idx in leaf_indices else "No",
+                "display_value": "Yes" if rank is not None else "No",
             },
             "leaf_rank": {
                 "display_name": "Leaf Rank (1-indexed)",
-                "display_value": str(leaf_indices[node.expand_idx]["rank"])
-                if node.expand_idx in leaf_indices
-                else "N/A",
+                "display_value": str(rank) if rank is not None else "N/A",
             },
             "leaf_score": {
                 "display_name": "Leaf Score",
-                "display_value": f"{leaf_indices[node.expand_idx]['score']:.4f}"
-                if node.expand_idx in leaf_indices
-                else "N/A",
+                "display_value": f"{node.score:.4f}" if rank is not None else "N/A",
             },
         }
 
+    def extract_all_metrics(
+        self, algo_state: BFSState[StateT], nodes: List[Node[StateT]]
+    ) -> Dict[int, Dict[str, Any]]:
+        """Extract BFS-specific metrics for all nodes in one pass."""
+        return {
+            node.expand_idx: self.extract_node_metrics(algo_state, node)
+            for node in nodes
+        }
+
     def get_algorithm_name(self, algo_state: BFSState[StateT]) -> str:
         """Get algorithm name."""
         return "BestFirstSearch"
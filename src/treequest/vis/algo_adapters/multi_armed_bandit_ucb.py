@@ -1,9 +1,15 @@
 """Visualization adapter for MultiArmedBanditUCB algorithm."""
 
 import math
-import statistics
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, TypeVar
+from typing import Any, Dict, List, Optional, Tuple, TypeVar
+
+import numpy as np
+
+try:
+    import numexpr as ne  # type: ignore[import-untyped]
+except ImportError:
+    ne = None
 
 from treequest.algos.multi_armed_bandit_ucb import UCBState
 from treequest.algos.tree import Node
@@ -11,7 +17,7 @@ from treequest.algos.tree import Node
 StateT = TypeVar("StateT")
 
 
-@dataclass
+@dataclass(slots=True)
 class _ActionStats:
     length: int
     minimum: Optional[float] = None
@@ -40,43 +46,84 @@ class _ActionStats:
 class MultiArmedBanditUCBAdapter:
     """Adapter for MultiArmedBanditUCB algorithm."""
 
+    # All metrics are snapshot-wide; per-node extraction adds nothing.
+    supports_root = False
+
     def __init__(self, exploration_weight: float = math.sqrt(2)):
         self.exploration_weight = exploration_weight
+        # The metrics depend only on algo_state.scores_by_action, not on the
+        # node, so they are identical for every node in a snapshot; cache the
+        # computed dict per algo state (total_len doubles as a version check).
+        # The entry pins algo_state and is matched by identity, so a new
+        # state reusing a freed state's id can never hit a stale entry.
+        self._stats_cache: Optional[Tuple[UCBState[Any], int, Dict[str, Any]]] = None
 
     def extract_node_metrics(
         self, algo_state: UCBState[StateT], node: Node[StateT]
     ) -> Dict[str, Any]:
-        """Extract UCB-specific metrics for a node."""
+        """Extract UCB-specific metrics for a node.
 
-        if not isinstance(algo_state, UCBState):
+        Kept for direct callers; the metrics do not actually depend on the
+        node, so snapshot builds get them via extract_global_metrics instead.
+        """
+        return self.extract_global_metrics(algo_state)
+
+    def extract_global_metrics(self, algo_state: UCBState[StateT]) -> Dict[str, Any]:
+        """Extract snapshot-wide UCB metrics (per-action statistics)."""
+
+        if type(algo_state) is not UCBState:
             return {}
         total_len = sum(len(scores) for scores in algo_state.scores_by_action.values())
         if total_len == 0:
             return {}
+        if (
+            self._stats_cache is not None
+            and self._stats_cache[0] is algo_state
+            and self._stats_cache[1] == total_len
+        ):
+            return self._stats_cache[2]
         actions: Dict[str, _ActionStats] = {}
         for action, scores in algo_state.scores_by_action.items():
             length = len(scores)
             if length == 0:
                 actions[action] = _ActionStats(length=0)
             else:
+                arr = np.asarray(scores, dtype=np.float64)
                 actions[action] = _ActionStats(
                     length=length,
-                    minimum=min(scores),
-                    maximum=max(scores),
-                    mean=statistics.mean(scores),
-                    median=statistics.median(scores),
-                    stdev=statistics.stdev(scores) if length > 1 else 0.0,
+                    minimum=float(arr.min()),
+                    maximum=float(arr.max()),
+                    mean=float(arr.mean()),
+                    median=float(np.median(arr)),
+                    stdev=float(arr.std(ddof=1)) if length > 1 else 0.0,
                 )
-        ucb_scores: Dict[str, float] = {}
-        for action, data in actions.items():
-            if data.length == 0 or data.mean is None:
-                continue
-            exploration_bonus = self.exploration_weight * math.sqrt(
-                math.log(total_len) / data.length
+        # All UCB scores in one vectorized expression; log(total_len) is
+        # constant across actions.
+        sampled = [action for action, data in actions.items() if data.length > 0]
+        means = np.array([actions[action].mean for action in sampled])
+        lengths = np.array(
+            [actions[action].length for action in sampled], dtype=np.float64
+        )
+        log_total_len = math.log(total_len)
+        if ne is not None:
+            # numexpr fuses the expression into a single pass over the arrays.
+            ucb_values = ne.evaluate(
+                "means + c * sqrt(log_total_len / lengths)",
+                local_dict={
+                    "means": means,
+                    "lengths": lengths,
+                    "c": self.exploration_weight,
+                    "log_total_len": log_total_len,
+                },
+            )
+        else:
+            ucb_values = means + self.exploration_weight * np.sqrt(
+                log_total_len / lengths
             )
-            ucb_scores[action] = data.mean + exploration_bonus
+        # Batch the UCB formatting instead of one f-string per action.
+        ucb_strs: Dict[str, str] = dict(zip(sampled, np.char.mod("%.3f", ucb_values)))
 
-        return {
+        metrics = {
             "total_len": {
                 "display_name": "Total Samples Recorded",
                 "display_value": str(total_len),
@@ -86,13 +133,25 @@ class MultiArmedBanditUCBAdapter:
                 "display_value": "<ul>"
                 + "".join(
                     f"<li><b>{action}</b>: UCB Score = "
-                    + (f"{ucb_scores[action]:.3f}" if action in ucb_scores else "N/A")
+                    + ucb_strs.get(action, "N/A")
                     + f" ({data.format()})</li>"
                     for action, data in sorted(actions.items())
                 )
                 + "</ul>",
             },
         }
+        self._stats_cache = (algo_state, total_len, metrics)
+        return metrics
+
+    def extract_all_metrics(
+        self, algo_state: UCBState[StateT], nodes: List[Node[StateT]]
+    ) -> Dict[int, Dict[str, Any]]:
+        """Extract UCB-specific metrics for all nodes in one pass.
+
+        All UCB metrics are node-independent and reported through
+        extract_global_metrics, so nothing is duplicated per node.
+        """
+        return {}
 
     def get_algorithm_name(self, algo_state: Any) -> str:
         """Get algorithm name."""
@@ -1,7 +1,9 @@
 """Visualization adapter for StandardMCTS algorithm."""
 
 import math
-from typing import Any, Dict, TypeVar
+from typing import Any, Dict, List, TypeVar
+
+import numpy as np
 
 from treequest.algos.standard_mcts import MCTSState
 from treequest.algos.tree import Node
@@ -12,6 +14,9 @@ StateT = TypeVar("StateT")
 class StandardMCTSAdapter:
     """Adapter for StandardMCTS algorithm."""
 
+    # Root visit counts are updated during backpropagation, so keep it.
+    supports_root = True
+
     def __init__(self, exploration_weight: float = math.sqrt(2)):
         self.exploration_weight = exploration_weight
 
@@ -20,7 +25,7 @@ class StandardMCTSAdapter:
     ) -> Dict[str, Any]:
         """Extract MCTS-specific metrics for a node."""
 
-        if not isinstance(algo_state, MCTSState):
+        if type(algo_state) is not MCTSState:
             return {}
         # Safe access with defaults to avoid KeyError / log(0) / div-by-zero
         parent_visits = (
@@ -67,6 +72,87 @@ class StandardMCTSAdapter:
             },
         }
 
+    def extract_all_metrics(
+        self, algo_state: MCTSState[StateT], nodes: List[Node[StateT]]
+    ) -> Dict[int, Dict[str, Any]]:
+        """Extract MCTS-specific metrics for all nodes in one pass.
+
+        Gathers visits, value sums, and priors into arrays and computes every
+        UCT score in a single vectorized expression; NaN marks the slots the
+        scalar path reports as "N/A".
+        """
+        if type(algo_state) is not MCTSState or not nodes:
+            return {}
+        n = len(nodes)
+        visit_counts = algo_state.visit_counts
+        visits = np.fromiter(
+            (visit_counts.get(node.expand_idx, 0) for node in nodes),
+            dtype=np.int64,
+            count=n,
+        )
+        parent_visits = np.fromiter(
+            (
+                visit_counts.get(node.parent.expand_idx, 1) if node.parent else 1
+                for node in nodes
+            ),
+            dtype=np.int64,
+            count=n,
+        )
+        value_sums = np.fromiter(
+            (algo_state.value_sums.get(node.expand_idx, 0.0) for node in nodes),
+            dtype=np.float64,
+            count=n,
+        )
+        priors = np.fromiter(
+            (
+                float(prior) if isinstance(prior, (int, float)) else np.nan
+                for prior in (algo_state.priors.get(node.expand_idx) for node in nodes)
+            ),
+            dtype=np.float64,
+            count=n,
+        )
+
+        visited = visits > 0
+        exploitation = np.divide(
+            value_sums, visits, out=np.full(n, np.nan), where=visited
+        )
+        explorable = visited & (parent_visits > 1) & ~np.isnan(priors)
+        exploration = np.full(n, np.nan)
+        exploration[explorable] = (
+            self.exploration_weight
+            * priors[explorable]
+            * np.sqrt(np.log(parent_visits[explorable]) / visits[explorable])
+        )
+        uct_scores = exploitation + exploration
+
+        all_metrics: Dict[int, Dict[str, Any]] = {}
+        for i, node in enumerate(nodes):
+            all_metrics[node.expand_idx] = {
+                "visits": {
+                    "display_name": "Visits",
+                    "display_value": f"{visits[i]:d}",
+                },
+                "mean": {
+                    "display_name": "Mean (Exploitation)",
+                    "display_value": f"{exploitation[i]:.3f}"
+                    if visited[i]
+                    else "N/A",
+                },
+                "prior": {
+                    "display_name": "Prior",
+                    "display_value": f"{priors[i]:.3f}"
+                    if not np.isnan(priors[i])
+                    else "N/A",
+                },
+                "uct_score": {
+                    "display_name": "UCT Score",
+                    "display_value": f"{uct_scores[i]:.3f}"
+                    if not np.isnan(uct_scores[i])
+                    else "N/A",
+                },
+            }
+        return all_metrics
+
     def get_algorithm_name(self, algo_state: Any) -> str:
         """Get algorithm name."""
         return "StandardMCTS"
@@ -11,12 +11,15 @@ StateT = TypeVar("StateT")
 class TreeOfThoughtsBFSAdapter:
     """Adapter for TreeOfThoughtsBFS algorithm."""
 
+    # No per-node metrics at all, so certainly none for the root.
+    supports_root = False
+
     def extract_node_metrics(
         self, algo_state: ToTBFSState[StateT], node: Node[StateT]
     ) -> Dict[str, Any]:
         """Extract ToTBFS-specific metrics for a node."""
 
-        if not isinstance(algo_state, ToTBFSState):
+        if type(algo_state) is not ToTBFSState:
             return {}
         return {}  # Currently, no specific metrics to extract
 
@@ -2,7 +2,10 @@
 
 import dataclasses
 import json
-from typing import Any, Callable, Dict, List, Optional, TypeVar, Union
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union
+
+import numpy as np
 
 from treequest.algos.tree import Tree
 from treequest.trial import Trial, TrialStore, TrialStoreWithNodeQueue
@@ -24,44 +27,79 @@ except Exception:  # pragma: no cover - pydantic is optional
     PydanticBaseModel = None
 
 
-def _default_state_formatter(state: Any) -> str:
-    """Default formatter for node states.
+@lru_cache(maxsize=None)
+def _dc_field_names(cls: type) -> Tuple[str, ...]:
+    """Field names of a dataclass type, resolved once per class."""
+    return tuple(f.name for f in dataclasses.fields(cls))
 
-    - If the state is a pydantic BaseModel, prefer JSON.
-    - If the state is a dataclass instance, serialize via asdict() to JSON.
-    - Fallback to repr()/str() otherwise.
 
+def _json_default(obj: Any) -> Any:
+    """json.dumps hook for values it cannot serialize natively.
+
+    Dataclass instances become a dict of raw field values (json.dumps then
+    recurses into them itself, so no Python-level pre-pass or deepcopy is
+    needed); everything else falls back to str().
+    """
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {name: getattr(obj, name) for name in _dc_field_names(type(obj))}
+    return str(obj)
+
+
+# Formatter resolved once per concrete state type; most trees hold states of
+# a single type, so the isinstance/hasattr classification runs once, not once
+# per node.
+_FORMATTER_CACHE: Dict[type, Callable[[Any], str]] = {}
+
+
+def _dataclass_formatter(state: Any) -> str:
+    # Single json.dumps pass; _json_default expands nested dataclasses on
+    # demand instead of a separate Python-level conversion walk.
+    return json.dumps(state, default=_json_default, separators=(",", ":"))
+
+
+def _classify_state_type(cls: type) -> Callable[[Any], str]:
+    """Pick the formatter for a state type.
+
+    - Pydantic BaseModel → JSON (v2 APIs preferred over v1).
+    - Dataclass → serialize its fields to JSON.
+    - Anything else → repr().
     """
     # NOTE: We use separators=(",", ":") workaround to get the consistent json string representation.
     # See https://github.com/pydantic/pydantic/issues/6606
+    if PydanticBaseModel is not None and issubclass(cls, PydanticBaseModel):
+        if hasattr(cls, "model_dump_json"):
+            # Pydantic v2 preferred API
+            return lambda state: state.model_dump_json()
+        if hasattr(cls, "model_dump"):
+            # Pydantic v2 Python object → JSON string
+            return lambda state: json.dumps(
+                state.model_dump(), default=_json_default, separators=(",", ":")
+            )
+        if hasattr(cls, "json"):
+            # Pydantic v1 API
+            return lambda state: state.json(separators=(",", ":"))
+    if dataclasses.is_dataclass(cls):
+        return _dataclass_formatter
+    return repr
 
-    # Pydantic BaseModel → JSON
-    if PydanticBaseModel is not None and isinstance(state, PydanticBaseModel):
-        try:
-            if hasattr(state, "model_dump_json"):
-                # Pydantic v2 preferred API
-                return state.model_dump_json()
-            if hasattr(state, "model_dump"):
-                # Pydantic v2 Python object → JSON string
-                return json.dumps(
-                    state.model_dump(), default=str, separators=(",", ":")
-                )
-            if hasattr(state, "json"):
-                # Pydantic v1 API
-                return state.json(separators=(",", ":"))
-        except Exception:
-            # Fall through to generic formatting
-            pass
 
-    # Dataclass instance → JSON
-    if dataclasses.is_dataclass(state) and not isinstance(state, type):
-        try:
-            return json.dumps(
-                dataclasses.asdict(state), default=str, separators=(",", ":")
-            )
-        except Exception:
-            # Fall through to generic formatting
-            pass
+def _default_state_formatter(state: Any) -> str:
+    """Default formatter for node states.
+
+    - If the state is a pydantic BaseModel, prefer JSON.
+    - If the state is a dataclass instance, serialize its fields to JSON.
+    - Fallback to repr()/str() otherwise.
+
+    """
+    cls = type(state)
+    formatter = _FORMATTER_CACHE.get(cls)
+    if formatter is None:
+        formatter = _FORMATTER_CACHE.setdefault(cls, _classify_state_type(cls))
+    try:
+        return formatter(state)
+    except Exception:
+        # Fall through to generic formatting
+        pass
 
     # Generic fallback
     try:
@@ -73,10 +111,48 @@ def _default_state_formatter(state: Any) -> str:
             return "<unrepresentable state>"
 
 
+def _truncate_to_top_nodes(
+    node_snapshots: List[NodeSnapshot],
+    edges: List[EdgeSnapshot],
+    max_nodes: int,
+) -> Tuple[List[NodeSnapshot], List[EdgeSnapshot]]:
+    """Keep the root, the top-scoring nodes, and their ancestor chains.
+
+    Selection uses np.argpartition (O(N), no full sort). Ancestors of kept
+    nodes are retained so the truncated tree stays connected, which can
+    leave slightly more than max_nodes nodes.
+    """
+    count = len(node_snapshots)
+    ids = np.fromiter((node.id for node in node_snapshots), np.int64, count=count)
+    scores = np.fromiter(
+        (node.score for node in node_snapshots), np.float64, count=count
+    )
+    non_root = np.flatnonzero(ids != -1)
+    k = max_nodes - 1  # The root is always kept
+    top = non_root[np.argpartition(scores[non_root], -k)[-k:]] if k > 0 else non_root[:0]
+
+    by_id = {node.id: node for node in node_snapshots}
+    keep_ids = {-1}
+    add_id = keep_ids.add
+    for index in top.tolist():
+        node = node_snapshots[index]
+        # Walk up until we meet an already-kept ancestor (or the root)
+        while node is not None and node.id not in keep_ids:
+            add_id(node.id)
+            node = by_id.get(node.parent_id) if node.parent_id is not None else None
+
+    kept_nodes = [node for node in node_snapshots if node.id in keep_ids]
+    kept_edges = [
+        edge for edge in edges if edge.source in keep_ids and edge.target in keep_ids
+    ]
+    return kept_nodes, kept_edges
+
+
 def build_snapshot(
     search_tree: AlgoStateT,
     state_formatter: Optional[Callable[[StateT], str]] = None,
     annotations: Optional[Dict[str, Any]] = None,
+    max_nodes: Optional[int] = None,
 ) -> VisualizationSnapshot:
     """
     Build a visualization snapshot from an algorithm state.
@@ -85,6 +161,10 @@ def build_snapshot(
         search_tree: Search tree state (return value of algo.init_tree, algo.step, algo.ask, or algo.tell).
         state_formatter: Optional function to format node states. Defaults to repr().
         annotations: Optional global annotations to add to metadata.
+        max_nodes: Optional limit on snapshot size. If the tree has more
+            nodes, only the highest-scoring ones are kept, plus the ancestors
+            needed to keep them connected to the root. Trials are not
+            filtered.
 
     Returns:
         VisualizationSnapshot ready for rendering
@@ -118,123 +198,184 @@ def build_snapshot(
     if state_formatter is None:
         state_formatter = _default_state_formatter
 
-    # Build node snapshots
+    # Build node snapshots. Output lists are pre-sized: every node yields a
+    # snapshot and every non-root node yields an edge, so index assignment
+    # avoids list-growth reallocations entirely.
     nodes = tree.get_nodes()
-    node_snapshots: List[NodeSnapshot] = []
-    edges: List[EdgeSnapshot] = []
+    num_nodes = len(nodes)
+    node_snapshots: List[NodeSnapshot] = [None] * num_nodes  # type: ignore[list-item]
+    edges: List[EdgeSnapshot] = [None] * (num_nodes - 1 if num_nodes else 0)  # type: ignore[list-item]
+
+    # Extract algorithm-specific metrics for all nodes up front, so adapters
+    # can compute per-snapshot invariants once instead of once per node.
+    all_algo_metrics: Dict[int, Dict[str, Any]] = {}
+    if adapter:
+        # Adapters whose root metrics are meaningless opt out of root calls.
+        if getattr(adapter, "supports_root", True):
+            metric_nodes = nodes
+        else:
+            metric_nodes = [node for node in nodes if not node.is_root()]
+        extract_all = getattr(adapter, "extract_all_metrics", None)
+        if extract_all is not None:
+            try:
+                all_algo_metrics = extract_all(search_tree, metric_nodes)
+            except Exception:
+                # Ignore errors in metric extraction
+                all_algo_metrics = {}
+        else:
+            # Back-compat for adapters that only implement the per-node API.
+            for node in metric_nodes:
+                try:
+                    all_algo_metrics[node.expand_idx] = adapter.extract_node_metrics(
+                        search_tree, node
+                    )
+                except Exception:
+                    # Ignore errors in metric extraction
+                    pass
+
+    # Hoisted locals for the node loop: empty dicts stand in for a missing
+    # trial store so each trial lookup is a single .get probe.
+    _finished: Dict[str, Trial] = finished_trials or {}
+    _running: Dict[str, Trial] = running_trials or {}
+
+    edge_i = 0
+    for node_i, node in enumerate(nodes):
+        # Hoist repeated attribute reads; is_root() is just `parent is None`.
+        parent = node.parent
+        is_root = parent is None
+        node_id = node.expand_idx
+        parent_id = parent.expand_idx if parent is not None else None
 
-    for node in nodes:
         # Get trial information if available
         trial_id = node.trial_id
         trial: Optional[Trial] = None
         action_from_parent: Optional[str] = None
         created_at: Optional[str] = None
         completed_at: Optional[str] = None
-        status: Optional[str] = "ROOT" if node.is_root() else None
+        status: Optional[str] = "ROOT" if is_root else None
 
-        if trial_id and trial_store:
-            # Try to find trial in finished trials
-            if finished_trials and trial_id in finished_trials:
-                trial = finished_trials[trial_id]
+        if trial_id:
+            # Try to find trial in finished trials, then in running trials
+            trial = _finished.get(trial_id)
+            if trial is not None:
                 action_from_parent = trial.action
                 created_at = trial.created_at
                 completed_at = trial.completed_at
                 status = trial.trial_status
-            # Try to find in running trials
-            elif running_trials and trial_id in running_trials:
-                trial = running_trials[trial_id]
-                action_from_parent = trial.action
-                created_at = trial.created_at
-                status = "RUNNING"
+            else:
+                trial = _running.get(trial_id)
+                if trial is not None:
+                    action_from_parent = trial.action
+                    created_at = trial.created_at
+                    status = "RUNNING"
 
         # Fill in default status for completed nodes without trial record
         if status is None:
             if trial_id is not None:
                 # Node exists but trial record cleaned up – treat as completed.
                 status = "COMPLETE"
-            elif node.is_root():
+            elif is_root:
                 status = "ROOT"
 
         # Get state representation
-        if node.is_root():
+        if is_root:
             state_repr = "ROOT"
         else:
             node_state = node.state
             if node_state is None:
                 raise InvalidStateError(
-                    f"Non-root node (ID: {node.expand_idx}) must have an associated state."
+                    f"Non-root node (ID: {node_id}) must have an associated state."
                 )
             try:
                 state_repr = state_formatter(node_state)
             except Exception:
                 state_repr = str(node_state)
 
-        # Extract algorithm-specific metrics
-        algo_metrics: Dict[str, Any] = {}
-        if adapter:
-            try:
-                algo_metrics = adapter.extract_node_metrics(search_tree, node)
-            except Exception:
-                # Ignore errors in metric extraction
-                pass
-
-        # Create node snapshot
-        node_snapshot = NodeSnapshot(
-            id=node.expand_idx,
-            trial_id=trial_id,
-            parent_id=node.parent.expand_idx if node.parent else None,
-            depth=node.depth,
-            score=node.score,
-            state_repr=state_repr,
-            action_from_parent=action_from_parent,
-            created_at=created_at,
-            completed_at=completed_at,
-            status=status,
-            annotations={},
-            algo_metrics=algo_metrics,
+        # Algorithm-specific metrics, extracted in bulk above
+        algo_metrics: Dict[str, Any] = all_algo_metrics.get(node_id, {})
+
+        # Create node snapshot (positional args follow NodeSnapshot field
+        # order; slots=True dataclasses make this the cheapest construction).
+        node_snapshots[node_i] = (
+            NodeSnapshot(
+                node_id,
+                trial_id,
+                parent_id,
+                node.depth,
+                node.score,
+                state_repr,
+                action_from_parent,
+                created_at,
+                completed_at,
+                status,
+                {},
+                algo_metrics,
+            )
         )
-        node_snapshots.append(node_snapshot)
 
         # Create edge snapshot
-        if node.parent:
-            edge = EdgeSnapshot(
-                source=node.parent.expand_idx,
-                target=node.expand_idx,
-                action=action_from_parent,
-            )
-            edges.append(edge)
+        if parent is not None:
+            edges[edge_i] = EdgeSnapshot(parent_id, node_id, action_from_parent)
+            edge_i += 1
+
+    # Trim in case the tree held fewer parented nodes than expected.
+    del edges[edge_i:]
+
+    # Optional top-k truncation before the snapshot is assembled
+    if max_nodes is not None and num_nodes > max_nodes:
+        node_snapshots, edges = _truncate_to_top_nodes(
+            node_snapshots, edges, max_nodes
+        )
 
-    # Build trial snapshots
+    # Build trial snapshots, pre-sized to one entry per stored trial
     trial_snapshots: List[TrialSnapshot] = []
     if trial_store and finished_trials is not None and running_trials is not None:
+        trial_snapshots = [None] * (  # type: ignore[list-item]
+            len(finished_trials) + len(running_trials)
+        )
+        trial_i = 0
+
         # Add finished trials
         for trial in finished_trials.values():
-            trial_snapshot = TrialSnapshot(
-                trial_id=trial.trial_id,
-                node_to_expand=trial.node_to_expand,
-                action=trial.action,
-                score=trial.score,
-                created_at=trial.created_at,
-                completed_at=trial.completed_at,
-                trial_status=trial.trial_status,
+            trial_snapshots[trial_i] = TrialSnapshot(
+                trial.trial_id,
+                trial.node_to_expand,
+                trial.action,
+                trial.score,
+                trial.created_at,
+                trial.completed_at,
+                trial.trial_status,
             )
-            trial_snapshots.append(trial_snapshot)
+            trial_i += 1
 
         # Add running trials
         for trial in running_trials.values():
-            trial_snapshot = TrialSnapshot(
-                trial_id=trial.trial_id,
-                node_to_expand=trial.node_to_expand,
-                action=trial.action,
-                score=None,
-                created_at=trial.created_at,
-                completed_at=None,
-                trial_status="RUNNING",
+            trial_snapshots[trial_i] = TrialSnapshot(
+                trial.trial_id,
+                trial.node_to_expand,
+                trial.action,
+                None,
+                trial.created_at,
+                None,
+                "RUNNING",
             )
-            trial_snapshots.append(trial_snapshot)
+            trial_i += 1
 
     # Create snapshot with metadata
-    additional_metadata = annotations or {}
+    additional_metadata = dict(annotations) if annotations else {}
+
+    # Snapshot-wide metrics go into metadata once instead of being duplicated
+    # into every node's algo_metrics.
+    if adapter:
+        extract_global = getattr(adapter, "extract_global_metrics", None)
+        if extract_global is not None:
+            try:
+                global_metrics = extract_global(search_tree)
+            except Exception:
+                # Ignore errors in metric extraction
+                global_metrics = {}
+            if global_metrics:
+                additional_metadata.setdefault("algo_metrics", global_metrics)
 
     snapshot: VisualizationSnapshot[StateT] = (
         VisualizationSnapshot.create_with_metadata(
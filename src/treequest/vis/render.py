@@ -1,16 +1,14 @@
 """High-level API for tree visualization."""
 
-import datetime as dt
+import os
+import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Callable, Dict, Optional, TypeVar, Union
+from typing import Any, Callable, Dict, Optional, Sequence, TypeVar, Union
 
 from treequest.vis.build_snapshot import build_snapshot
 from treequest.vis.errors import VisualizationError
-from treequest.vis.renderers.graphviz_renderer import render_graphviz
-from treequest.vis.renderers.html import render_html
-from treequest.vis.renderers.json_yaml import dump_snapshot
-from treequest.vis.renderers.mermaid import render_mermaid
 from treequest.vis.snapshot import VisualizationSnapshot
 
 StateT = TypeVar("StateT")
@@ -82,8 +80,14 @@ def render(
         )
 
     output_path = Path(output_basename).resolve()
-    if output_path.is_dir():  # Generate filename with timestamp
-        timestamp = dt.datetime.now(dt.timezone.utc).strftime("%Y%m%d_%H%M%S")
+    # Only stat the filesystem when the basename could plausibly be a
+    # directory (trailing separator or no file suffix); an explicit stem with
+    # a suffix is always treated as a file basename.
+    may_be_dir = str(output_basename).endswith(("/", os.sep)) or not output_path.suffix
+    if may_be_dir and output_path.is_dir():  # Generate filename with timestamp
+        # Same UTC timestamp as datetime.now(timezone.utc).strftime, without
+        # constructing a tz-aware datetime object.
+        timestamp = time.strftime("%Y%m%d_%H%M%S", time.gmtime())
         output_basename = str(output_path / f"treequest_{timestamp}")
         warnings.warn(
             (
@@ -95,18 +99,79 @@ def render(
     else:
         output_basename = str(output_path)
 
-    # Route to appropriate renderer
+    # Route to appropriate renderer. Renderer modules are imported lazily per
+    # format so that e.g. a JSON dump never pulls in graphviz or jinja2.
     format = format.lower()
     if format in ["png", "pdf", "svg", "jpg", "jpeg"]:  # Graphviz formats
+        from treequest.vis.renderers.graphviz_renderer import render_graphviz
+
         render_graphviz(snapshot, output_basename, format=format, **renderer_kwargs)
     elif format in ["json", "yaml"]:  # Data export formats
+        from treequest.vis.renderers.json_yaml import dump_snapshot
+
         dump_snapshot(snapshot, output_basename, format=format, **renderer_kwargs)
     elif format in ["mermaid", "md", "markdown"]:  # Mermaid diagram
+        from treequest.vis.renderers.mermaid import render_mermaid
+
         render_mermaid(snapshot, output_basename, format=format, **renderer_kwargs)
     elif format == "html":  # HTML renderer
+        from treequest.vis.renderers.html import render_html
+
         render_html(snapshot, output_basename, format=format, **renderer_kwargs)
     else:
         raise VisualizationError(
             f"Unsupported format: {format}. "
             f"Supported formats: png, pdf, svg, jpg, jpeg, json, yaml, mermaid, md, html"
         )
+
+
+def render_all(
+    search_tree: Union[AlgoStateT, VisualizationSnapshot[StateT]],
+    output_basename: Union[str, Path],
+    *,
+    formats: Sequence[str],
+    state_formatter: Optional[Callable[[StateT], str]] = None,
+    annotations: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    Render one snapshot to several formats concurrently.
+
+    The snapshot is built once and shared; each format then renders in a
+    thread pool. The renderers are independent and largely I/O-bound (file
+    writes, the dot subprocess), so formats overlap instead of running
+    back to back.
+
+    Args:
+        search_tree: Search tree state or a pre-built VisualizationSnapshot.
+        output_basename: Output file path without extension, as for render().
+        formats: Formats to render, e.g. ["json", "mermaid", "html"].
+        state_formatter: Optional function to format node states.
+        annotations: Optional annotations to add to snapshot metadata.
+
+    Raises:
+        VisualizationError: If inputs are invalid or any rendering fails
+
+    Example:
+        >>> import treequest as tq
+        >>> tq.vis.render_all(state, "logs/run42", formats=["json", "html"])
+    """
+    if not formats:
+        raise VisualizationError("formats must not be empty")
+
+    if isinstance(search_tree, VisualizationSnapshot):
+        snapshot = search_tree
+    else:
+        snapshot = build_snapshot(
+            search_tree,
+            state_formatter=state_formatter,
+            annotations=annotations,
+        )
+
+    with ThreadPoolExecutor(max_workers=len(formats)) as executor:
+        futures = [
+            executor.submit(render, snapshot, output_basename, format=fmt)
+            for fmt in formats
+        ]
+        # Surface the first failure; the executor still drains the rest.
+        for future in futures:
+            future.result()
@@ -1,17 +1,12 @@
-"""Renderers for visualization output."""
-
-from treequest.vis.renderers.graphviz_renderer import render_graphviz
-from treequest.vis.renderers.json_yaml import dump_snapshot
-from treequest.vis.renderers.html import render_html
-from treequest.vis.renderers.mermaid import render_mermaid
-from treequest.vis.renderers.color_utils import (
-    ColorMap,
-    GrayscaleColorMap,
-    InterpolatedColorMap,
-    get_colormap,
-    list_colormap_names,
-    resolve_colormap,
-)
+"""Renderers for visualization output.
+
+Renderer modules are imported lazily (PEP 562) so that importing this package
+does not pull in optional dependencies like graphviz or jinja2 until the
+corresponding renderer is actually used.
+"""
+
+import importlib
+from typing import Any
 
 __all__ = [
     "render_graphviz",
@@ -25,3 +20,31 @@ __all__ = [
     "list_colormap_names",
     "resolve_colormap",
 ]
+
+# Maps each public name to the submodule that defines it.
+_LAZY_IMPORTS = {
+    "render_graphviz": "treequest.vis.renderers.graphviz_renderer",
+    "dump_snapshot": "treequest.vis.renderers.json_yaml",
+    "render_html": "treequest.vis.renderers.html",
+    "render_mermaid": "treequest.vis.renderers.mermaid",
+    "ColorMap": "treequest.vis.renderers.color_utils",
+    "GrayscaleColorMap": "treequest.vis.renderers.color_utils",
+    "InterpolatedColorMap": "treequest.vis.renderers.color_utils",
+    "get_colormap": "treequest.vis.renderers.color_utils",
+    "list_colormap_names": "treequest.vis.renderers.color_utils",
+    "resolve_colormap": "treequest.vis.renderers.color_utils",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    # Cache on the package so subsequent lookups skip __getattr__.
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
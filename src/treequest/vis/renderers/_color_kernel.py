@@ -0,0 +1,59 @@
+"""Optional numba-accelerated kernel for batch colormap evaluation.
+
+Importable whether or not numba is installed; callers should check
+HAS_NUMBA before routing large batches here, since the un-jitted Python
+loop is slower than the NumPy fallback in color_utils.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+
+    HAS_NUMBA = True
+except ImportError:  # pragma: no cover - numba is optional
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is unavailable."""
+        if args and callable(args[0]):
+            return args[0]
+
+        def wrap(func):
+            return func
+
+        return wrap
+
+
+@njit(cache=True)
+def interpolate_colors(
+    values: np.ndarray, lut: np.ndarray, min_value: float, max_value: float
+) -> np.ndarray:
+    """Clip, normalize, and LUT-interpolate scores into uint8 RGB rows.
+
+    Mirrors InterpolatedColorMap.get_color_tuples_batch operation for
+    operation (same float ordering, same truncations) so the jitted and
+    NumPy paths produce identical colors, without NumPy's intermediate
+    temporaries.
+    """
+    n = values.shape[0]
+    lut_len = lut.shape[0]
+    span = max_value - min_value
+    out = np.empty((n, 3), dtype=np.uint8)
+    for i in range(n):
+        value = values[i]
+        if value < min_value:
+            value = min_value
+        elif value > max_value:
+            value = max_value
+        position = (value - min_value) / span * (lut_len - 1)
+        lower = int(position)
+        upper = lower + 1
+        if upper > lut_len - 1:
+            upper = lut_len - 1
+        t = position - lower
+        for channel in range(3):
+            out[i, channel] = np.uint8(
+                lut[lower, channel] * (1.0 - t) + lut[upper, channel] * t
+            )
+    return out
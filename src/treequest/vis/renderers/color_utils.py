@@ -1,18 +1,32 @@
 import abc
 import json
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Tuple, Optional
 
+import numpy as np
+
+from treequest.vis.renderers._color_kernel import HAS_NUMBA, interpolate_colors
+
+# Two-digit lowercase hex for every byte value, so batch conversion indexes a
+# table instead of running format-spec parsing per channel.
+_BYTE_HEX = tuple(f"{i:02x}" for i in range(256))
+
+# Batches at least this large amortize the numba kernel's dispatch cost;
+# smaller ones stay on the NumPy path.
+_KERNEL_MIN_SIZE = 4096
+
 
 def color_tuple_to_hex(color: Tuple[int, int, int]) -> str:
     """Convert an (R, G, B) tuple to a hex color string."""
-    return "#{:02x}{:02x}{:02x}".format(color[0], color[1], color[2])
+    return "#" + _BYTE_HEX[color[0]] + _BYTE_HEX[color[1]] + _BYTE_HEX[color[2]]
 
 
 def hex_to_color_tuple(hex_color: str) -> Tuple[int, int, int]:
     """Convert a hex color string to an (R, G, B) tuple."""
-    hex_color = hex_color.lstrip("#")
-    return (int(hex_color[0:2], 16), int(hex_color[2:4], 16), int(hex_color[4:6], 16))
+    # One int parse plus bitshifts instead of three slice+int calls.
+    packed = int(hex_color.lstrip("#"), 16)
+    return (packed >> 16 & 0xFF, packed >> 8 & 0xFF, packed & 0xFF)
 
 
 class ColorMap(abc.ABC):
@@ -22,8 +36,17 @@ class ColorMap(abc.ABC):
 
     def get_color_hex(self, value: float) -> str:
         """Get the hex color string for a given value."""
-        color_tuple = self.get_color_tuple(value)
-        return color_tuple_to_hex(color_tuple)
+        r, g, b = self.get_color_tuple(value)
+        return "#" + _BYTE_HEX[r] + _BYTE_HEX[g] + _BYTE_HEX[b]
+
+
+# One (g, g, g) tuple per gray level, shared by all GrayscaleColorMap
+# instances; int(normalized * 255) already quantizes values to 256 bins, so
+# indexing this table is exact and skips a tuple allocation per call.
+_GRAY_TUPLES = tuple((i, i, i) for i in range(256))
+
+# Parallel hex strings so get_color_hex is a single table read too.
+_GRAY_HEX = tuple("#" + _BYTE_HEX[i] * 3 for i in range(256))
 
 
 class GrayscaleColorMap(ColorMap):
@@ -42,8 +65,28 @@ class GrayscaleColorMap(ColorMap):
         if value > self.max_value:
             value = self.max_value
         normalized = (value - self.min_value) / (self.max_value - self.min_value)
-        gray_level = int(normalized * 255)
-        return (gray_level, gray_level, gray_level)
+        return _GRAY_TUPLES[int(normalized * 255)]
+
+    def get_color_hex(self, value: float) -> str:
+        """Get the hex color string for a given value."""
+        if value < self.min_value:
+            value = self.min_value
+        if value > self.max_value:
+            value = self.max_value
+        normalized = (value - self.min_value) / (self.max_value - self.min_value)
+        return _GRAY_HEX[int(normalized * 255)]
+
+    def get_color_tuples_batch(self, values: Any) -> np.ndarray:
+        """Map an array of values to grayscale colors in one vectorized pass.
+
+        Returns a (len(values), 3) uint8 array; each row matches what
+        get_color_tuple would return for the corresponding value.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = np.clip(values, self.min_value, self.max_value)
+        normalized = (values - self.min_value) / (self.max_value - self.min_value)
+        gray_levels = (normalized * 255).astype(np.uint8)
+        return np.repeat(gray_levels[:, None], 3, axis=1)
 
 
 class InterpolatedColorMap(ColorMap):
@@ -57,51 +100,80 @@ class InterpolatedColorMap(ColorMap):
         min_value: Minimum value to map
         max_value: Maximum value to map
         reverse: If True, reverse the color order (equivalent to matplotlib's _r suffix)
+        lut: Pre-built uint8 LUT (see _get_lut). Already validated and
+            reverse-applied, so color_data validation is skipped entirely.
     """
 
     def __init__(
         self,
-        color_data: List[Tuple[int, int, int]],
+        color_data: Optional[List[Tuple[int, int, int]]] = None,
         min_value: float = 0.0,
         max_value: float = 1.0,
         reverse: bool = False,
+        *,
+        lut: Optional[np.ndarray] = None,
     ):
-        if not color_data:
-            raise ValueError("color_data must not be empty")
-        for color in color_data:
-            if len(color) != 3 or any(
-                not (0 <= c <= 255) or not isinstance(c, int) for c in color
-            ):
-                raise ValueError(
-                    "Each color in color_data must be a tuple of three integers (R, G, B) in range 0-255"
-                )
         if min_value >= max_value:
             raise ValueError("min_value must be less than max_value")
-
-        self.color_data = list(reversed(color_data)) if reverse else list(color_data)
         self.min_value = min_value
         self.max_value = max_value
+        if lut is not None:
+            self._lut = lut
+            return
+        if not color_data:
+            raise ValueError("color_data must not be empty")
+        # Validate all stops in one vectorized pass: ragged input fails the
+        # array conversion, float/object dtypes fail the kind check, and the
+        # range check covers every channel at once.
+        try:
+            arr = np.asarray(color_data)
+        except ValueError:
+            arr = None
+        if (
+            arr is None
+            or arr.ndim != 2
+            or arr.shape[1] != 3
+            or arr.dtype.kind not in "iu"
+            or (arr < 0).any()
+            or (arr > 255).any()
+        ):
+            raise ValueError(
+                "Each color in color_data must be a tuple of three integers (R, G, B) in range 0-255"
+            )
+
+        # The contiguous uint8 array is the only color store (3 bytes per
+        # stop instead of a list of tuple objects); reversal is a view.
+        arr = arr.astype(np.uint8, copy=False)
+        self._lut = arr[::-1] if reverse else arr
+
+    @property
+    def color_data(self) -> List[Tuple[int, int, int]]:
+        """Stop colors as Python tuples, reconstructed from the uint8 LUT."""
+        return [tuple(color) for color in self._lut.tolist()]
 
     def get_color_tuple(self, value: float) -> Tuple[int, int, int]:
         """Map a value to an RGB color using linear interpolation."""
+        lut = self._lut
         # Clamp value to range
         if value <= self.min_value:
-            return self.color_data[0]
+            r, g, b = lut[0].tolist()
+            return (r, g, b)
         if value >= self.max_value:
-            return self.color_data[-1]
+            r, g, b = lut[-1].tolist()
+            return (r, g, b)
 
         # Normalize to [0, 1]
         normalized = (value - self.min_value) / (self.max_value - self.min_value)
 
-        # Calculate position in color_data
-        position = normalized * (len(self.color_data) - 1)
+        # Calculate position in the LUT
+        position = normalized * (len(lut) - 1)
         lower_idx = int(position)
-        upper_idx = min(lower_idx + 1, len(self.color_data) - 1)
+        upper_idx = min(lower_idx + 1, len(lut) - 1)
 
         # Linear interpolation between adjacent colors
         t = position - lower_idx
-        lower_color = self.color_data[lower_idx]
-        upper_color = self.color_data[upper_idx]
+        lower_color = lut[lower_idx].tolist()
+        upper_color = lut[upper_idx].tolist()
 
         r = int(lower_color[0] * (1 - t) + upper_color[0] * t)
         g = int(lower_color[1] * (1 - t) + upper_color[1] * t)
@@ -109,6 +181,37 @@ class InterpolatedColorMap(ColorMap):
 
         return (r, g, b)
 
+    def get_color_tuples_batch(self, values: Any) -> np.ndarray:
+        """Map an array of values to RGB colors in a single vectorized pass.
+
+        Returns a (len(values), 3) uint8 array; each row matches what
+        get_color_tuple would return for the corresponding value.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if HAS_NUMBA and values.shape[0] >= _KERNEL_MIN_SIZE:
+            # Large batches go through the fused numba kernel, which skips
+            # the NumPy temporaries below and produces identical colors.
+            return interpolate_colors(
+                values, self._lut, self.min_value, self.max_value
+            )
+        values = np.clip(values, self.min_value, self.max_value)
+        normalized = (values - self.min_value) / (self.max_value - self.min_value)
+
+        position = normalized * (len(self._lut) - 1)
+        lower_idx = position.astype(np.int32)
+        upper_idx = np.minimum(lower_idx + 1, len(self._lut) - 1)
+        t = (position - lower_idx)[:, None]
+        return (self._lut[lower_idx] * (1 - t) + self._lut[upper_idx] * t).astype(
+            np.uint8
+        )
+
+    def get_colors_hex_batch(self, values: Any) -> List[str]:
+        """Map an array of values to hex color strings in one pass."""
+        return [
+            "#" + _BYTE_HEX[r] + _BYTE_HEX[g] + _BYTE_HEX[b]
+            for r, g, b in self.get_color_tuples_batch(values).tolist()
+        ]
+
 
 # Colormap data loading and factory functions
 _COLORMAP_DATA_CACHE: Optional[Dict[str, Any]] = None
@@ -132,6 +235,35 @@ def _load_colormap_data() -> Dict[str, Any]:
     return _COLORMAP_DATA_CACHE
 
 
+@lru_cache(maxsize=64)
+def _get_lut(name: str, reverse: bool) -> np.ndarray:
+    """uint8 LUT for a named colormap, converted (and reversed) once.
+
+    Caching per (name, reverse) means repeated get_colormap() calls reuse the
+    same array instead of re-converting the JSON color lists.
+    """
+    data = _load_colormap_data()
+    lut = np.asarray(data["colormaps"][name]["colors"], dtype=np.uint8)
+    if reverse:
+        lut = lut[::-1]
+    # Cached arrays are shared across colormap instances; freeze them so an
+    # accidental in-place write cannot corrupt every consumer.
+    lut.flags.writeable = False
+    return lut
+
+
+@lru_cache(maxsize=128)
+def _get_colormap_cached(
+    name: str, min_value: float, max_value: float, reverse: bool
+) -> "InterpolatedColorMap":
+    """Build (or reuse) the colormap instance for this exact parameter set."""
+    return InterpolatedColorMap(
+        min_value=min_value,
+        max_value=max_value,
+        lut=_get_lut(name, reverse),
+    )
+
+
 def list_colormap_names() -> List[str]:
     """List all available colormap names.
 
@@ -154,7 +286,9 @@ def get_colormap(
         reverse: If True, reverse the color order (equivalent to matplotlib's _r suffix)
 
     Returns:
-        InterpolatedColorMap instance ready to use
+        InterpolatedColorMap instance ready to use. Instances are cached per
+        (name, min_value, max_value, reverse) and shared between callers, so
+        treat them as immutable.
 
     Raises:
         ValueError: If colormap name is not found
@@ -179,17 +313,7 @@ def get_colormap(
             f"(total {len(available)}). Use list_colormap_names() for full list."
         )
 
-    color_data: List[Tuple[int, int, int]] = data["colormaps"][name]["colors"]
-
-    # Convert list of lists to list of tuples
-    color_tuples = [(r, g, b) for r, g, b in color_data]
-
-    return InterpolatedColorMap(
-        color_data=color_tuples,
-        min_value=min_value,
-        max_value=max_value,
-        reverse=reverse,
-    )
+    return _get_colormap_cached(name, min_value, max_value, reverse)
 
 
 def resolve_colormap(
@@ -253,13 +377,13 @@ def resolve_colormap(
 
 ROOT_COLOR = "#AAAAAA"  # light gray
 
+_STATUS_COLORS = {
+    "RUNNING": "#C277DC",  # purple
+    "INVALID": "#76502E",  # brown
+    "ROOT": ROOT_COLOR,
+}
+
 
 def apply_status_color(status: Optional[str], default_color: str = ROOT_COLOR) -> str:
     """Adjust the node color based on execution status."""
-    if status == "RUNNING":
-        return "#C277DC"  # purple
-    if status == "INVALID":
-        return "#76502E"  # brown
-    if status == "ROOT":
-        return ROOT_COLOR
-    return default_color
+    return _STATUS_COLORS.get(status, default_color)
@@ -1,17 +1,42 @@
 """Graphviz renderer for tree visualization."""
 
+import shutil
+from functools import lru_cache
 from typing import Callable, Optional, Union
 
+import numpy as np
+
 from treequest.vis.errors import DependencyNotFoundError, RenderError
 from treequest.vis.snapshot import VisualizationSnapshot
 from treequest.vis.renderers.color_utils import (
     ROOT_COLOR,
     ColorMap,
+    InterpolatedColorMap,
     apply_status_color,
     resolve_colormap,
 )
 
 
+@lru_cache(maxsize=1)
+def _dot_available() -> bool:
+    """Whether the Graphviz `dot` executable is on PATH, checked once.
+
+    The PATH walk is cached for the process; call
+    ``_dot_available.cache_clear()`` to force re-detection after an
+    environment change.
+    """
+    return shutil.which("dot") is not None
+
+
+def _quote(value: str) -> str:
+    """Quote a DOT identifier or attribute value, escaping double quotes.
+
+    Backslash sequences such as ``\\n`` (DOT line breaks in labels and
+    tooltips) are left intact, matching the graphviz wrapper's own quoting.
+    """
+    return '"' + value.replace('"', '\\"') + '"'
+
+
 def render_graphviz(
     snapshot: VisualizationSnapshot,
     output_basename: str,
@@ -49,13 +74,31 @@ def render_graphviz(
             "graphviz Python package is not installed. Install it with: pip install treequest[vis]"
         )
 
+    # Fail fast (before building the DOT body) when dot is known-missing
+    if not _dot_available():
+        raise DependencyNotFoundError(
+            "Graphviz executable is not in system PATH. "
+            "Please install Graphviz: https://graphviz.org/download/"
+        )
+
     # Normalize format
     format = format.lower()
 
-    # Calculate score range for colormap
-    scores = [node.score for node in snapshot.nodes if node.score >= 0]
-    min_score = min(scores) if scores else 0.0
-    max_score = max(scores) if scores else 1.0
+    # Calculate score range for colormap: one pass over the nodes, no
+    # intermediate list.
+    min_score = max_score = None
+    for node in snapshot.nodes:
+        score = node.score
+        if score < 0:
+            continue
+        if min_score is None or score < min_score:
+            min_score = score
+        if max_score is None or score > max_score:
+            max_score = score
+    if min_score is None:
+        min_score = 0.0
+    if max_score is None:
+        max_score = 1.0
     if min_score == max_score:  # Expand range to avoid division by zero
         max_score = max_score + 0.5
         min_score = min_score - 0.5
@@ -63,14 +106,44 @@ def render_graphviz(
     # Resolve color_map to a callable
     color_fn = resolve_colormap(color_map, min_score, max_score)
 
+    # Interpolated colormaps (the default) can color every node in one
+    # vectorized pass instead of one Python-level interpolation per node.
+    nodes = snapshot.nodes
+    cmap = getattr(color_fn, "__self__", None)
+    if isinstance(cmap, InterpolatedColorMap):
+        node_scores = np.fromiter(
+            (node.score for node in nodes), dtype=np.float64, count=len(nodes)
+        )
+        node_colors = cmap.get_colors_hex_batch(node_scores)
+    else:
+        node_colors = [color_fn(node.score) for node in nodes]
+
     # Create directed graph
     dot = graphviz.Digraph(comment=title or "Tree Visualization")
 
     if title:
         dot.attr(label=title, labelloc="t", fontsize="16")
 
+    # Snapshot-wide metrics live in metadata["algo_metrics"] rather than on
+    # individual nodes; surface them as the graph tooltip and again on the
+    # root node so they are reachable in SVG output.
+    global_metric_lines = []
+    for key, value in (snapshot.metadata.get("algo_metrics") or {}).items():
+        if isinstance(value, dict) and "display_value" in value:
+            name = value.get("display_name", key)
+            global_metric_lines.append(f"{name}: {value['display_value']}")
+        else:
+            global_metric_lines.append(f"{key}: {value}")
+    if global_metric_lines:
+        dot.attr(tooltip="\\n".join(global_metric_lines))
+
+    # Emit DOT statements directly into the graph body: dot.node()/dot.edge()
+    # re-run attribute quoting and formatting machinery per call, which
+    # dominates for large trees.
+    body_append = dot.body.append
+
     # Add nodes
-    for node in snapshot.nodes:
+    for node_index, node in enumerate(nodes):
         node_id = str(node.id)
 
         # Create label
@@ -92,45 +165,51 @@ def render_graphviz(
             label = "\\n".join(label_parts)
 
             # Get color from score
-            color = color_fn(node.score)
-            color = apply_status_color(node.status, color)
+            color = apply_status_color(node.status, node_colors[node_index])
 
-        # Create tooltip with metrics
+        # Create tooltip with metrics; sections are skipped entirely when
+        # empty, and appends go through a hoisted bound method.
         tooltip_parts = [f"Node ID: {node.id}", f"Score: {node.score:.4f}"]
+        tp_app = tooltip_parts.append
         if node.status:
-            tooltip_parts.append(f"Status: {node.status}")
+            tp_app(f"Status: {node.status}")
         if node.action_from_parent:
-            tooltip_parts.append(f"Action: {node.action_from_parent}")
+            tp_app(f"Action: {node.action_from_parent}")
         if node.algo_metrics:
-            tooltip_parts.append("Metrics:")
+            tp_app("Metrics:")
             for key, value in node.algo_metrics.items():
-                if isinstance(value, dict) and "value" in value:
-                    display_value = value["value"]
-                else:
-                    display_value = value
-                tooltip_parts.append(f"  {key}: {display_value}")
+                tp_app(
+                    f"  {key}: {value['value'] if isinstance(value, dict) and 'value' in value else value}"
+                )
         if node.annotations:
-            tooltip_parts.append("Annotations:")
+            tp_app("Annotations:")
             for key, value in node.annotations.items():
-                tooltip_parts.append(f"  {key}: {value}")
+                tp_app(f"  {key}: {value}")
+        if node.id == -1 and global_metric_lines:
+            tp_app("Search Metrics:")
+            for line in global_metric_lines:
+                tp_app(f"  {line}")
 
         tooltip = "\\n".join(tooltip_parts)
 
         # Add node
-        dot.node(node_id, label=label, style="filled", fillcolor=color, tooltip=tooltip)
+        body_append(
+            f"\t{_quote(node_id)} [label={_quote(label)} style=filled"
+            f" fillcolor={_quote(color)} tooltip={_quote(tooltip)}]\n"
+        )
 
     # Add edges
-    for edge in snapshot.edges:
-        source_id = str(edge.source)
-        target_id = str(edge.target)
-
-        # Create edge label
-        edge_label = edge.action if edge.action else ""
-        dot.edge(source_id, target_id, label=edge_label)
-
-    # Render
+    dot.body.extend(
+        f"\t{_quote(str(edge.source))} -> {_quote(str(edge.target))}"
+        f" [label={_quote(edge.action if edge.action else '')}]\n"
+        for edge in snapshot.edges
+    )
+
+    # Render by streaming the DOT source over dot's stdin and writing the
+    # output bytes directly; render() would first persist a source file next
+    # to the output and delete it again after the subprocess finishes.
     try:
-        dot.render(filename=output_basename, format=format, cleanup=True)
+        data = dot.pipe(format=format)
     except graphviz.backend.execute.ExecutableNotFound:
         raise DependencyNotFoundError(
             "Graphviz executable is not in system PATH. "
@@ -138,3 +217,8 @@ def render_graphviz(
         )
     except Exception as e:
         raise RenderError(f"Failed to render Graphviz output: {e}")
+    try:
+        with open(f"{output_basename}.{format}", "wb") as f:
+            f.write(data)
+    except Exception as e:
+        raise RenderError(f"Failed to render Graphviz output: {e}")
@@ -1,12 +1,17 @@
 """D3.js-based interactive HTML renderer for tree visualization."""
 
+import json
+from functools import lru_cache
 from pathlib import Path
 from typing import Callable, Dict, List, Optional, Union
 
+import numpy as np
+
 from treequest.vis.errors import DependencyNotFoundError, RenderError
 from treequest.vis.renderers.color_utils import (
     ROOT_COLOR,
     ColorMap,
+    InterpolatedColorMap,
     apply_status_color,
     resolve_colormap,
 )
@@ -14,22 +19,42 @@ from treequest.vis.renderers.json_yaml import snapshot_to_dict
 from treequest.vis.snapshot import VisualizationSnapshot
 
 
-def _get_d3_js() -> str:
-    """Load d3.js from bundled assets."""
-    d3_path = Path(__file__).parents[1] / "assets" / "d3.v7.min.js"
-    if not d3_path.exists():
-        raise RenderError(f"d3.js not found at {d3_path}")
-    with open(d3_path, "r") as f:
-        return f.read()
+def _tojson_safe(obj) -> str:
+    """Serialize to the same HTML-safe JSON Jinja's |tojson filter emits.
 
+    Serializing once here and embedding via |safe spares Jinja a second
+    traversal of the data through the filter machinery. Escapes match
+    jinja2's htmlsafe_json_dumps so the payload stays XSS-safe inside
+    <script> blocks.
+    """
+    return (
+        json.dumps(obj, sort_keys=True)
+        .replace("<", "\\u003c")
+        .replace(">", "\\u003e")
+        .replace("&", "\\u0026")
+        .replace("'", "\\u0027")
+    )
+
+
+@lru_cache(maxsize=1)
+def _get_compiled_template():
+    """Compile the Jinja2 template once and reuse it across renders.
+
+    Template compilation dominates render_html for users rendering many
+    snapshots (e.g. one per algorithm step). Loading from the assets
+    directory lets the template pull in d3.js via {% include %} at compile
+    time, so the ~280 KB script no longer flows through the render context
+    on every call.
+    """
+    from jinja2 import Environment, FileSystemLoader
 
-def _get_template() -> str:
-    """Load HTML template from assets directory."""
-    template_path = Path(__file__).parents[1] / "assets" / "d3_tree.html.jinja2"
-    if not template_path.exists():
-        raise RenderError(f"HTML template not found at {template_path}")
-    with open(template_path, "r") as f:
-        return f.read()
+    assets_dir = Path(__file__).parents[1] / "assets"
+    # auto_reload=False: bundled assets never change at runtime, so skip the
+    # per-lookup mtime stat jinja2 does by default with a filesystem loader.
+    env = Environment(
+        loader=FileSystemLoader(assets_dir), autoescape=True, auto_reload=False
+    )
+    return env.get_template("d3_tree.html.jinja2")
 
 
 def render_html(
@@ -71,7 +96,7 @@ def render_html(
         RenderError: If rendering fails
     """
     try:
-        from jinja2 import Template
+        import jinja2  # noqa: F401
     except ImportError:
         raise DependencyNotFoundError(
             "jinja2 is not installed. Install it with: pip install treequest[vis]"
@@ -93,63 +118,86 @@ def render_html(
     except Exception as e:
         raise RenderError(f"Failed to convert snapshot to dictionary: {e}")
 
-    # Load d3.js and Jinja2 template
-    d3_js = _get_d3_js()
-    template_str = _get_template()
-
-    # Calculate score range for colormap
-    scores = [node.score for node in snapshot.nodes if node.score >= 0]
-    min_score = min(scores) if scores else 0.0
-    max_score = max(scores) if scores else 1.0
-    score_all_same = False
-    if min_score == max_score:  # Expand range to avoid division by zero
-        score_all_same = True
+    # Score range for the colormap, computed once per snapshot
+    min_score, max_score, score_all_same = snapshot.score_range
+    if score_all_same:  # Expand range to avoid division by zero
         max_score = max_score + 0.5
         min_score = min_score - 0.5
 
     # Resolve color_map to a callable
     color_fn = resolve_colormap(color_map, min_score, max_score)
 
+    # Interpolated colormaps (the default) can color nodes and legend samples
+    # in single vectorized passes; custom callables keep the scalar loop.
+    cmap = getattr(color_fn, "__self__", None)
+    batched = isinstance(cmap, InterpolatedColorMap)
+
     try:
         # Pre-compute node colors for client-side rendering
+        nodes = snapshot.nodes
+        span = max_score - min_score
+        if batched:
+            # Score column comes straight from the snapshot's SoA view.
+            hex_colors = cmap.get_colors_hex_batch(snapshot.columns.scores)
+        else:
+            # Custom callables get specialized to the score range: sample a
+            # 256-entry LUT once, then color every node (and the legend) by
+            # quantized index. Total callable cost is O(256), not O(N).
+            lut = [color_fn(min_score + i * span / 255) for i in range(256)]
+            clipped = np.clip(snapshot.columns.scores, min_score, max_score)
+            indices = ((clipped - min_score) * (255.0 / span)).astype(np.int64)
+            hex_colors = [lut[i] for i in indices.tolist()]
         node_colors: Dict[int, str] = {}
-        for node in snapshot.nodes:
+        for i, node in enumerate(nodes):
             if node.id == -1 or node.score < 0:
                 base_color = ROOT_COLOR
             else:
-                base_color = color_fn(node.score)
+                base_color = hex_colors[i]
             node_colors[node.id] = apply_status_color(node.status, base_color)
 
         sample_count = 100
         legend_samples: List[Dict[str, Union[float, str]]] = []
 
         if score_all_same:
-            color_value = color_fn(min_score)
+            # Every sample is identical; share one dict across the list
+            # (the legend is serialized immediately, never mutated).
+            single = {"value": float(min_score), "color": color_fn(min_score)}
+            legend_samples = [single] * sample_count
+        else:
+            # Same arithmetic as the scalar loop (min + span * i/(n-1)), so
+            # the emitted values are bit-identical.
+            positions = np.arange(sample_count, dtype=np.float64) / (sample_count - 1)
+            values = min_score + (max_score - min_score) * positions
+            if batched:
+                sample_colors = cmap.get_colors_hex_batch(values)
+            else:
+                # Slice the node LUT instead of re-invoking the callable.
+                sample_indices = ((values - min_score) * (255.0 / span)).astype(
+                    np.int64
+                )
+                sample_colors = [lut[i] for i in sample_indices.tolist()]
             legend_samples = [
-                {"value": float(min_score), "color": color_value}
-                for _ in range(sample_count)
+                {"value": value, "color": color}
+                for value, color in zip(values.tolist(), sample_colors)
             ]
-        else:
-            for i in range(sample_count):
-                position = i / (sample_count - 1)
-                value = min_score + (max_score - min_score) * position
-                legend_samples.append({"value": float(value), "color": color_fn(value)})
 
-        # Render template
-        template = Template(template_str, autoescape=True)
+        # Render template (compiled once per process)
+        template = _get_compiled_template()
         html_content = template.render(
-            snapshot_dict=snapshot_dict,
+            snapshot_json=_tojson_safe(snapshot_dict),
             metadata=snapshot.metadata,
             theme=theme,
-            d3_js=d3_js,
-            node_colors=node_colors,
-            color_legend_samples=legend_samples,
-            colormap_stats={"minScore": float(min_score), "maxScore": float(max_score)},
+            node_colors_json=_tojson_safe(node_colors),
+            color_legend_samples_json=_tojson_safe(legend_samples),
+            colormap_stats_json=_tojson_safe(
+                {"minScore": float(min_score), "maxScore": float(max_score)}
+            ),
         )
 
-        # Write to file
-        with open(output_basename + ".html", "w") as f:
-            f.write(html_content)
+        # Write to file; encoding up front and writing binary skips the
+        # text layer's incremental encoder and newline translation.
+        with open(output_basename + ".html", "wb") as f:
+            f.write(html_content.encode("utf-8"))
 
     except DependencyNotFoundError:
         raise
@@ -6,8 +6,82 @@ from typing import Any, Dict, List, Optional
 
 import yaml
 
+try:
+    # libyaml-backed emitter; typically an order of magnitude faster than the
+    # pure-Python dumper for large snapshots.
+    from yaml import CSafeDumper as _YamlDumper
+except ImportError:  # pragma: no cover - libyaml is optional
+    from yaml import SafeDumper as _YamlDumper
+
+try:
+    # C encoder that serializes dataclasses natively and emits bytes; used
+    # for JSON dumps at the default indent when available.
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
 from treequest.vis.errors import RenderError
-from treequest.vis.snapshot import VisualizationSnapshot
+from treequest.vis.snapshot import (
+    EdgeSnapshot,
+    NodeSnapshot,
+    TrialSnapshot,
+    VisualizationSnapshot,
+)
+
+# Node field names resolved once; snapshot_to_dict walks them with getattr
+# instead of dataclasses.asdict, which deep-copies every value recursively.
+_NODE_FIELDS = tuple(f.name for f in dataclasses.fields(NodeSnapshot))
+
+
+class _SnapshotEncoder(json.JSONEncoder):
+    """JSON encoder that serializes snapshot dataclasses directly.
+
+    Fuses dict conversion into the encoder's traversal, so an unfiltered
+    JSON dump skips the intermediate snapshot_to_dict pass. Anything else
+    (e.g. lazily built display values) falls back to str(), which matches
+    what _materialize_display_values produces on the dict path.
+    """
+
+    def default(self, o: Any) -> Any:
+        if isinstance(o, NodeSnapshot):
+            return {k: getattr(o, k) for k in _NODE_FIELDS}
+        if isinstance(o, EdgeSnapshot):
+            return {"source": o.source, "target": o.target, "action": o.action}
+        if isinstance(o, TrialSnapshot):
+            return {
+                "trial_id": o.trial_id,
+                "node_to_expand": o.node_to_expand,
+                "action": o.action,
+                "score": o.score,
+                "created_at": o.created_at,
+                "completed_at": o.completed_at,
+                "trial_status": o.trial_status,
+            }
+        if isinstance(o, VisualizationSnapshot):
+            return {
+                "nodes": o.nodes,
+                "edges": o.edges,
+                "trials": o.trials,
+                "metadata": o.metadata,
+            }
+        return str(o)
+
+
+def _materialize_display_values(algo_metrics: Optional[Dict[str, Any]]) -> None:
+    """Force lazily built display_value entries into plain strings in place.
+
+    Adapters may defer expensive HTML formatting behind objects that only
+    build on str(); serialization is the point where they must materialize.
+    """
+    if not algo_metrics:
+        return
+    for metric in algo_metrics.values():
+        if isinstance(metric, dict):
+            display_value = metric.get("display_value")
+            if display_value is not None and not isinstance(
+                display_value, (bool, int, float, str)
+            ):
+                metric["display_value"] = str(display_value)
 
 
 def snapshot_to_dict(
@@ -26,25 +100,45 @@ def snapshot_to_dict(
         include_annotations: Whether to include annotations
 
     Returns:
-        Dictionary representation of the snapshot
+        Dictionary representation of the snapshot. Nested dicts (annotations,
+        algo_metrics, metadata) are shared with the snapshot, not copied.
     """
     try:
-        # Filter node fields if requested
+        # Resolve the node field set once instead of filtering per node
+        node_fields = _NODE_FIELDS
+        if include_fields is not None:
+            node_fields = tuple(k for k in node_fields if k in include_fields)
+        if not include_algo_metrics:
+            node_fields = tuple(k for k in node_fields if k != "algo_metrics")
+        if not include_annotations:
+            node_fields = tuple(k for k in node_fields if k != "annotations")
+        materialize = "algo_metrics" in node_fields
+
         filtered_nodes = []
         for node in snapshot.nodes:
-            node_dict = dataclasses.asdict(node)
-            if include_fields is not None:
-                node_dict = {k: v for k, v in node_dict.items() if k in include_fields}
-            if not include_algo_metrics:
-                node_dict.pop("algo_metrics", None)
-            if not include_annotations:
-                node_dict.pop("annotations", None)
+            node_dict = {k: getattr(node, k) for k in node_fields}
+            if materialize:
+                _materialize_display_values(node_dict["algo_metrics"])
             filtered_nodes.append(node_dict)
 
         return {
             "nodes": filtered_nodes,
-            "edges": [dataclasses.asdict(edge) for edge in snapshot.edges],
-            "trials": [dataclasses.asdict(trial) for trial in snapshot.trials],
+            "edges": [
+                {"source": edge.source, "target": edge.target, "action": edge.action}
+                for edge in snapshot.edges
+            ],
+            "trials": [
+                {
+                    "trial_id": trial.trial_id,
+                    "node_to_expand": trial.node_to_expand,
+                    "action": trial.action,
+                    "score": trial.score,
+                    "created_at": trial.created_at,
+                    "completed_at": trial.completed_at,
+                    "trial_status": trial.trial_status,
+                }
+                for trial in snapshot.trials
+            ],
             "metadata": snapshot.metadata,
         }
     except Exception as e:
@@ -83,6 +177,41 @@ def dump_snapshot(
     if format not in ["json", "yaml"]:
         raise ValueError(f"Unsupported format: {format}. Use 'json' or 'yaml'.")
 
+    output_path = f"{output_basename}.{format}"
+
+    # Unfiltered JSON dumps can serialize the snapshot directly through the
+    # encoder; field filtering still goes through the dict conversion below.
+    if format == "json" and (
+        include_fields is None and include_algo_metrics and include_annotations
+    ):
+        try:
+            if orjson is not None and indent == 2:
+                # orjson walks the nested snapshot dataclasses directly; str()
+                # covers lazy display values, matching the stdlib encoder's
+                # fallback. The top level is projected explicitly because the
+                # snapshot itself carries cached_property values (columns,
+                # score_range) in its __dict__ once another renderer has
+                # touched them, and orjson would dump those as extra keys.
+                payload = orjson.dumps(
+                    {
+                        "nodes": snapshot.nodes,
+                        "edges": snapshot.edges,
+                        "trials": snapshot.trials,
+                        "metadata": snapshot.metadata,
+                    },
+                    default=str,
+                    option=orjson.OPT_INDENT_2,
+                )
+            else:
+                payload = json.dumps(
+                    snapshot, cls=_SnapshotEncoder, indent=indent
+                ).encode("utf-8")
+            with open(output_path, "wb") as f:
+                f.write(payload)
+        except Exception as e:
+            raise RenderError(f"Failed to write JSON file: {e}")
+        return
+
     # Convert snapshot to dict
     try:
         snapshot_dict = snapshot_to_dict(
@@ -95,13 +224,23 @@ def dump_snapshot(
         raise RenderError(f"Failed to convert snapshot to dictionary: {e}")
 
     # Serialize
-    output_path = f"{output_basename}.{format}"
     try:
         if format == "json":
-            with open(output_path, "w") as f:
-                json.dump(snapshot_dict, f, indent=indent)
+            # Encode in memory and write once: json.dump issues many small
+            # writes (one per token), which is markedly slower for large
+            # snapshots.
+            if orjson is not None and indent == 2:
+                payload = orjson.dumps(
+                    snapshot_dict, default=str, option=orjson.OPT_INDENT_2
+                )
+            else:
+                payload = json.dumps(snapshot_dict, indent=indent).encode("utf-8")
+            with open(output_path, "wb") as f:
+                f.write(payload)
         elif format == "yaml":
             with open(output_path, "w") as f:
-                yaml.dump(snapshot_dict, f, indent=indent, sort_keys=False)
+                yaml.dump(
+                    snapshot_dict, f, Dumper=_YamlDumper, indent=indent, sort_keys=False
+                )
     except Exception as e:
         raise RenderError(f"Failed to write {format.upper()} file: {e}")
@@ -1,7 +1,12 @@
 """Mermaid diagram renderer for tree visualization."""
 
+import heapq
+import io
+from operator import attrgetter
 from typing import Callable, Optional, Union
 
+import numpy as np
+
 from treequest.vis.errors import RenderError
 from treequest.vis.snapshot import VisualizationSnapshot
 from treequest.vis.renderers.color_utils import ROOT_COLOR, ColorMap, resolve_colormap
@@ -47,19 +52,24 @@ def render_mermaid(
         # Filter nodes if max_nodes is specified
         nodes = snapshot.nodes
         if max_nodes is not None and len(nodes) > max_nodes:
-            # Sort by score and take top nodes, always include root
-            root = [n for n in nodes if n.id == -1]
-            non_root = [n for n in nodes if n.id != -1]
-            non_root_sorted = sorted(non_root, key=lambda n: n.score, reverse=True)
-            nodes = root + non_root_sorted[: max_nodes - 1]
-
-        # Build node ID mapping
-        node_ids = {node.id for node in nodes}
-
-        # Calculate score range for colormap
-        scores = [node.score for node in nodes if node.score >= 0]
-        min_score = min(scores) if scores else 0.0
-        max_score = max(scores) if scores else 1.0
+            # Split in one pass; take the top scorers without a full sort
+            # (nlargest is O(N log k)) and always include the root.
+            root = []
+            non_root = []
+            for node in nodes:
+                (root if node.id == -1 else non_root).append(node)
+            nodes = root + heapq.nlargest(
+                max_nodes - 1, non_root, key=attrgetter("score")
+            )
+
+        # Calculate score range for colormap; the cached snapshot-level range
+        # only applies when the node set was not filtered above.
+        if nodes is snapshot.nodes:
+            min_score, max_score, _ = snapshot.score_range
+        else:
+            scores = [node.score for node in nodes if node.score >= 0]
+            min_score = min(scores) if scores else 0.0
+            max_score = max(scores) if scores else 1.0
         if min_score == max_score:  # Expand range to avoid division by zero
             max_score = max_score + 0.5
             min_score = min_score - 0.5
@@ -67,22 +77,37 @@ def render_mermaid(
         # Resolve color_map to a callable
         color_fn = resolve_colormap(color_map, min_score, max_score)
 
-        # Start building Mermaid diagram
-        lines = ["%%{init: {'theme':'" + theme + "'}}%%", "graph TD"]
+        # Start building Mermaid diagram; writing into a single StringIO
+        # avoids materializing one short string per line plus the final join.
+        buf = io.StringIO()
+        write = buf.write
+        write("%%{init: {'theme':'" + theme + "'}}%%\ngraph TD")
+
+        # Format every score in one vectorized pass; %-formatting a float64
+        # array avoids re-parsing the format spec per node in the loop below.
+        score_strs = np.char.mod(
+            "%.2f",
+            np.fromiter((node.score for node in nodes), np.float64, count=len(nodes)),
+        )
 
-        # Add nodes with direct color specification
-        for node in nodes:
+        # Add nodes with direct color specification, marking a membership
+        # mask for edge filtering in the same pass. Ids are offset by +1 so
+        # the root's id of -1 lands at index 0; a flat bool lookup is cheaper
+        # than set hashing in the edge loop.
+        id_mask = np.zeros(int(snapshot.columns.ids.max()) + 2, dtype=bool)
+        for node, score_str in zip(nodes, score_strs):
+            id_mask[node.id + 1] = True
             node_id = f"node{node.id}"
 
             # Create label
             if node.id == -1:
                 label = "ROOT"
             else:
-                label = f"ID: {node.id}"
-                label += f"<br/>Score: {node.score:.2f}"
-                label += f"<br/>{node.state_repr[:20]}"
-                if len(node.state_repr) > 20:
-                    label += "..."
+                state_repr = node.state_repr
+                label = (
+                    f"ID: {node.id}<br/>Score: {score_str}"
+                    f"<br/>{state_repr[:20]}{'...' if len(state_repr) > 20 else ''}"
+                )
 
             # Get color from colormap
             if node.id == -1 or node.score < 0:
@@ -90,27 +115,28 @@ def render_mermaid(
             else:
                 fill_color = color_fn(node.score)
 
-            # Add node
-            lines.append(f'    {node_id}["{label}"]')
-            # Add style with direct color specification
-            lines.append(
-                f"    style {node_id} fill:{fill_color},stroke:#333,stroke-width:2px"
-            )
+            # Add node and its style with direct color specification
+            write(f'\n    {node_id}["{label}"]')
+            write(f"\n    style {node_id} fill:{fill_color},stroke:#333,stroke-width:2px")
 
-        # Add edges (only if both nodes are in the filtered set)
+        # Add edges (only if both nodes are in the filtered set), partitioned
+        # by label so each group is emitted in one writelines call with a
+        # branch-free line template. Labeled edges come before plain ones;
+        # Mermaid renders edge statements position-independently.
+        labeled = []
+        plain = []
         for edge in snapshot.edges:
-            if edge.source in node_ids and edge.target in node_ids:
-                source_id = f"node{edge.source}"
-                target_id = f"node{edge.target}"
-
-                # Create edge label
-                edge_label = edge.action if edge.action else ""
-                if edge_label:
-                    lines.append(f'    {source_id} -->|"{edge_label}"| {target_id}')
-                else:
-                    lines.append(f"    {source_id} --> {target_id}")
+            if id_mask[edge.source + 1] and id_mask[edge.target + 1]:
+                (labeled if edge.action else plain).append(edge)
+        buf.writelines(
+            f'\n    node{edge.source} -->|"{edge.action}"| node{edge.target}'
+            for edge in labeled
+        )
+        buf.writelines(
+            f"\n    node{edge.source} --> node{edge.target}" for edge in plain
+        )
 
-        mermaid_str = "\n".join(lines)
+        mermaid_str = buf.getvalue()
 
         # Wrap in markdown code block if format is markdown
         if format in ["md", "markdown"]:
@@ -118,7 +144,9 @@ def render_mermaid(
 
         # Write to file if output_basename is provided
         ext = ".md" if format in ["md", "markdown"] else ".mermaid"
-        with open(output_basename + ext, "w") as f:
-            f.write(mermaid_str)
+        # Encode once and write binary; skips the text layer's incremental
+        # encoder and newline translation.
+        with open(output_basename + ext, "wb") as f:
+            f.write(mermaid_str.encode("utf-8"))
     except Exception as e:
         raise RenderError(f"Failed to render Mermaid diagram: {e}")
@@ -2,16 +2,18 @@
 
 import dataclasses
 from datetime import datetime, timezone
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from importlib import metadata as importlib_metadata
-from typing import Any, Dict, Generic, List, Optional, TypeVar, Union
+from typing import Any, Dict, Generic, List, Optional, Tuple, TypeVar, Union
+
+import numpy as np
 
 from treequest.types import NodeId, TrialId
 
 StateT = TypeVar("StateT")
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class AlgoMetrics:
     """Algorithm-specific metrics for a node."""
 
@@ -19,7 +21,7 @@ class AlgoMetrics:
     display_value: str
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class NodeSnapshot:
     """Snapshot of a single node in the tree."""
 
@@ -46,7 +48,7 @@ class NodeSnapshot:
     )
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class EdgeSnapshot:
     """Snapshot of an edge in the tree."""
 
@@ -55,7 +57,7 @@ class EdgeSnapshot:
     action: Optional[str] = None
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class TrialSnapshot:
     """Snapshot of a trial."""
 
@@ -68,6 +70,22 @@ class TrialSnapshot:
     trial_status: str
 
 
+@dataclasses.dataclass(slots=True)
+class NodesColumns:
+    """Column-oriented (structure-of-arrays) view of a snapshot's nodes.
+
+    Renderers that process every node in bulk (colormap evaluation, score
+    statistics) can consume these parallel columns instead of dereferencing
+    each NodeSnapshot field individually.
+    """
+
+    ids: np.ndarray
+    scores: np.ndarray
+    depths: np.ndarray
+    statuses: List[Optional[str]]
+    state_reprs: List[str]
+
+
 @dataclasses.dataclass
 class VisualizationSnapshot(Generic[StateT]):
     """Complete snapshot of tree state for visualization."""
@@ -86,6 +104,51 @@ class VisualizationSnapshot(Generic[StateT]):
         if not any(node.id == -1 for node in self.nodes):
             raise ValueError("Snapshot must contain a root node (id=-1)")
 
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle only the declared fields, not lazily cached views.
+
+        Cached views (``columns``, ``score_range``) are derived data:
+        dropping them keeps pickled snapshots lean and they are rebuilt on
+        first access after load.
+        """
+        state = self.__dict__.copy()
+        state.pop("columns", None)
+        state.pop("score_range", None)
+        return state
+
+    @cached_property
+    def columns(self) -> NodesColumns:
+        """Columnar view of the nodes, built lazily and cached."""
+        nodes = self.nodes
+        count = len(nodes)
+        return NodesColumns(
+            ids=np.fromiter((node.id for node in nodes), dtype=np.int64, count=count),
+            scores=np.fromiter(
+                (node.score for node in nodes), dtype=np.float64, count=count
+            ),
+            depths=np.fromiter(
+                (node.depth for node in nodes), dtype=np.int64, count=count
+            ),
+            statuses=[node.status for node in nodes],
+            state_reprs=[node.state_repr for node in nodes],
+        )
+
+    @cached_property
+    def score_range(self) -> Tuple[float, float, bool]:
+        """(min, max, all_same) over non-negative node scores, cached.
+
+        Falls back to (0.0, 1.0, False) when no node has a valid score;
+        all_same flags a degenerate range so renderers can widen it before
+        building a colormap.
+        """
+        scores = self.columns.scores
+        valid = scores[scores >= 0]
+        if valid.size == 0:
+            return 0.0, 1.0, False
+        lo = float(valid.min())
+        hi = float(valid.max())
+        return lo, hi, lo == hi
+
     @classmethod
     def create_with_metadata(
         cls,
@@ -1,3 +1,4 @@
+import io
 import warnings
 from typing import Optional
 
@@ -103,3 +104,67 @@ def visualize_tree_graphviz(
     except graphviz.backend.execute.ExecutableNotFound:
         print("graphviz executable is not in system Path, visualization skipped...")
         return None
+
+
+def visualize_tree_dot(
+    tree: Tree,
+    show_scores: bool = True,
+    max_label_length: int = 20,
+    title: Optional[str] = None,
+) -> str:
+    """
+    Render a Tree directly to Graphviz DOT source.
+
+    Unlike :func:`visualize_tree_graphviz`, this does not build a
+    ``graphviz.Digraph`` object (or invoke the graphviz executable at all);
+    it walks the tree once and writes raw DOT statements into a string
+    buffer. Use this when only the textual DOT source is needed, e.g. for
+    transport to a client that does its own rendering.
+
+    Args:
+        tree: The Tree object to visualize
+        show_scores: Whether to show scores in node labels
+        max_label_length: Maximum length for node labels
+        title: Optional title for the visualization
+
+    Returns:
+        The DOT source as a string
+    """
+    buf = io.StringIO()
+    buf.write(f"// {title or 'Tree Visualization'}\n")
+    buf.write("digraph {\n")
+    if title:
+        escaped_title = title.replace('"', '\\"')
+        buf.write(f'\tlabel="{escaped_title}"\n')
+
+    for node in tree.get_nodes():
+        node_id = str(node.expand_idx)
+
+        if node.is_root():
+            label = "ROOT"
+            color = "lightgray"
+        else:
+            state_str = str(node.state)
+            if len(state_str) > max_label_length:
+                state_str = state_str[:max_label_length] + "..."
+
+            if show_scores:
+                label = f"{state_str}\\nScore: {node.score:.2f}\\nExpandIdx: {node.expand_idx}"
+            else:
+                label = state_str
+
+            if node.score >= 0.7:
+                color = "lightgreen"
+            elif node.score >= 0.4:
+                color = "lightyellow"
+            else:
+                color = "lightcoral"
+
+        label = label.replace('"', '\\"')
+        buf.write(f'\t"{node_id}" [label="{label}" style=filled fillcolor={color}]\n')
+
+        if node.parent:
+            buf.write(f'\t"{node.parent.expand_idx}" -> "{node_id}"\n')
+
+    buf.write("}\n")
+    return buf.getvalue()
@@ -40,7 +40,30 @@ def test_ab_mcts_a_adapter_reports_action_probas() -> None:
     root_metrics = adapter.extract_node_metrics(state, state.tree.root)
     assert "action_probas" in root_metrics
     assert "display_value" in root_metrics["action_probas"]
-    assert isinstance(root_metrics["action_probas"]["display_value"], str)
+    # display_value may be built lazily; str() materializes the HTML
+    assert str(root_metrics["action_probas"]["display_value"]).startswith("<ul>")
+
+
+def test_lazy_display_values_interpolate_as_html() -> None:
+    """Whole metric dicts embedded in text (the graphviz tooltip path) must
+    show the built HTML, not a lazy wrapper's object repr."""
+    algo: ABMCTSA[StateType] = ABMCTSA()
+    state: ABMCTSAAlgoState[StateType] = algo.init_tree()
+
+    generate_fns: Dict[str, GenerateFnType[StateType]] = {
+        "explore": lambda parent: ("explore", 0.8),
+        "exploit": lambda parent: ("exploit", 0.3),
+    }
+    for _ in range(4):
+        state = algo.step(state, generate_fns)
+
+    adapter = ABMCTSAAdapter()
+    metrics = adapter.extract_node_metrics(state, state.tree.root)
+    # Mirrors render_graphviz's tooltip loop, which interpolates the whole
+    # metric dict and therefore goes through repr() of display_value
+    rendered = "".join(f"  {key}: {value}" for key, value in metrics.items())
+    assert "<ul>" in rendered
+    assert "object at 0x" not in rendered
 
 
 def test_ab_mcts_m_adapter_aggregates_descendant_observations() -> None:
@@ -61,7 +84,7 @@ def test_ab_mcts_m_adapter_aggregates_descendant_observations() -> None:
     # Adapter reports human-readable lists and flags under display_value
     assert "rewards_by_action" in metrics
     assert "rewards_by_child" in metrics
-    assert metrics["rewards_by_action"]["display_value"].startswith("<ul>")
+    assert str(metrics["rewards_by_action"]["display_value"]).startswith("<ul>")
 
 
 def test_multi_armed_bandit_adapter_reports_global_stats() -> None:
@@ -94,6 +94,31 @@ class TestInterpolatedColorMap:
         assert cmap.get_color_tuple(-1.0) == (255, 0, 0)
         assert cmap.get_color_tuple(2.0) == (0, 0, 255)
 
+    def test_batch_matches_scalar(self):
+        cmap = get_colormap("viridis", 0.0, 100.0)
+        values = [-5.0, 0.0, 12.5, 33.3, 50.0, 66.7, 99.9, 100.0, 150.0]
+
+        batch = cmap.get_color_tuples_batch(values)
+        assert batch.shape == (len(values), 3)
+        for value, row in zip(values, batch.tolist()):
+            assert tuple(row) == cmap.get_color_tuple(value)
+
+        hex_batch = cmap.get_colors_hex_batch(values)
+        assert hex_batch == [cmap.get_color_hex(value) for value in values]
+
+    def test_numba_kernel_matches_numpy_batch(self):
+        from treequest.vis.renderers._color_kernel import HAS_NUMBA, interpolate_colors
+
+        if not HAS_NUMBA:
+            pytest.skip("numba not installed")
+        import numpy as np
+
+        cmap = get_colormap("coolwarm", -2.0, 3.0)
+        values = np.linspace(-3.0, 4.0, 500)
+        kernel = interpolate_colors(values, cmap._lut, cmap.min_value, cmap.max_value)
+        numpy_batch = cmap.get_color_tuples_batch(values)
+        assert (kernel == numpy_batch).all()
+
     def test_empty_colors_raises_error(self):
         with pytest.raises(ValueError, match="must not be empty"):
             InterpolatedColorMap([], 0.0, 1.0)
@@ -12,16 +12,21 @@ from typing import Optional, Tuple
 import pytest
 
 from treequest.algos.standard_mcts import StandardMCTS
-from treequest.vis import build_snapshot, render
+from treequest.vis import build_snapshot, render, render_all
 from treequest.vis.errors import DependencyNotFoundError, VisualizationError
 
+# Matches Mermaid node definition lines; compiled once for all tests.
+_NODE_DEF_RE = re.compile(r"^\s*node-?\d+\[", re.MULTILINE)
+
 
 def create_test_state():
     """Create a simple test state for rendering tests."""
-    random.seed(42)
+    # A local Random instance avoids reseeding (and locking) the global
+    # random module; same seed, same sequence.
+    rng = random.Random(42)
 
     def generate_fn(state: Optional[str]) -> Tuple[str, float]:
-        score = random.uniform(0.0, 1.0)
+        score = rng.uniform(0.0, 1.0)
         return f"State(score={score:.2f})", score
 
     algo = StandardMCTS(samples_per_action=1)
@@ -84,7 +89,7 @@ def test_render_mermaid_with_max_nodes():
         # Count node definition lines only (avoid counting edges/style directives)
         with open(mermaid_file) as f:
             result = f.read()
-        defs = re.findall(r"^\s*node-?\d+\[", result, flags=re.MULTILINE)
+        defs = _NODE_DEF_RE.findall(result)
         assert len(defs) <= 3
 
 
@@ -144,6 +149,60 @@ def test_render_with_snapshot():
         assert json_file.exists()
 
 
+def test_build_snapshot_with_max_nodes():
+    """Test top-k truncation inside build_snapshot."""
+    rng = random.Random(7)
+
+    def generate_fn(state: Optional[str]) -> Tuple[str, float]:
+        score = rng.uniform(0.0, 1.0)
+        return f"State(score={score:.2f})", score
+
+    # Two actions give a branching tree, so truncation can actually drop
+    # leaves instead of keeping every node via ancestor chains.
+    algo = StandardMCTS(samples_per_action=2)
+    state = algo.init_tree()
+    generate_fns = {"a": generate_fn, "b": generate_fn}
+    for _ in range(10):
+        state = algo.step(state, generate_fns)
+
+    full = build_snapshot(state)
+    snapshot = build_snapshot(state, max_nodes=3)
+
+    assert len(snapshot.nodes) < len(full.nodes)
+    assert any(node.id == -1 for node in snapshot.nodes)
+
+    # Edges must only connect surviving nodes
+    kept = {node.id for node in snapshot.nodes}
+    for edge in snapshot.edges:
+        assert edge.source in kept and edge.target in kept
+
+    # The best-scoring node always survives truncation
+    best = max((node for node in full.nodes if node.id != -1), key=lambda n: n.score)
+    assert best.id in kept
+
+
+def test_render_all_multiple_formats():
+    """Test concurrent rendering of one snapshot to several formats."""
+    state = create_test_state()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_path = Path(tmpdir) / "test"
+        render_all(state, str(output_path), formats=["json", "yaml", "mermaid"])
+
+        for ext in ("json", "yaml", "mermaid"):
+            assert Path(f"{output_path}.{ext}").exists()
+
+        # The JSON top level must hold exactly the snapshot's declared fields:
+        # other renderers sharing the snapshot populate its cached properties
+        # (columns, score_range), which must never leak into the dump.
+        with open(f"{output_path}.json") as f:
+            data = json.load(f)
+        assert set(data) == {"nodes", "edges", "trials", "metadata"}
+
+    with pytest.raises(VisualizationError):
+        render_all(state, "test", formats=[])
+
+
 def test_render_invalid_format():
     """Test that rendering with invalid format raises error."""
     state = create_test_state()